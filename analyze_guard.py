@@ -0,0 +1,465 @@
+"""
+파일별 시간/크기 예산을 두고 워커 프로세스에서 분석을 실행하는 모듈입니다.
+
+; 가 빠진 EXEC SQL 블록이나 닫히지 않은 문자열 리터럴이 있으면 DOTALL 정규식이
+매 시작 위치마다 파일 끝까지 탐색하여 파일 하나의 분석이 사실상 멈출 수 있습니다.
+- 각 파일은 워커 프로세스에서 분석하며, 시간 예산을 넘긴 워커는 종료하고 새로 띄웁니다.
+- 크기 예산을 넘은 파일과 시간 초과/오류가 난 파일은 안전 스캐너(analyze_stream_safe)로 다시 분석합니다.
+  안전 스캐너는 파일을 청크 단위로 읽으므로 큰 파일도 전체를 메모리에 올리지 않습니다.
+  문자 리터럴('"')은 정규식 분석과 다르게 처리하므로, 다시 분석된 파일은 결과가 달라질 수 있습니다.
+- 문제 파일은 issues 목록으로 보고하며, 나머지 파일의 분석은 계속 진행됩니다.
+
+multiprocessing 은 이 모듈에서만 사용하며, proc_analyzer.main()에서 지연 import 됩니다.
+"""
+import io
+import multiprocessing
+import os
+import re
+import time
+from collections import defaultdict, deque
+from multiprocessing.connection import wait
+
+from proc_analyzer import (
+    DESC_PATTERNS, EXEC_SQL_PENDING_PATTERN, STREAM_CHUNK_SIZE, LineIndex, analyze_content,
+    analyze_file, classify_statements, description_value, merge_statement_results,
+    record_locations, scan_descriptions, string_literal_sql
+)
+
+# 기본 예산
+DEFAULT_TIMEOUT = 30.0               # 파일당 정규식 분석 시간 (초)
+DEFAULT_MAX_SIZE = 16 * 1024 * 1024  # 정규식 분석을 시도할 최대 파일 크기 (바이트)
+
+# 안전 스캐너에서 분류할 최대 구문 길이 (문자 수). 이보다 긴 구문은 건너뜁니다.
+SAFE_MAX_STATEMENT = 64 * 1024
+
+# 안전 스캐너 패턴: 모두 한 번 매칭되면 실패 후 재시도(백트래킹) 없이 앞으로만 진행합니다.
+# - EXEC SQL 머리부만 찾고, ; 는 str.find 로 SAFE_MAX_STATEMENT 범위 안에서만 찾음
+SAFE_EXEC_HEAD_PATTERN = re.compile(r'EXEC\s+SQL\s+', re.IGNORECASE)
+# - 문자열 리터럴. 닫는 " 나 줄바꿈(줄 이음 \ 제외)에서 멈추며 항상 매칭됨 (닫혔으면 그룹 1 매칭)
+SAFE_LITERAL_PATTERN = re.compile(r'"(?:\\[\s\S]|[^"\\\n])*(")?')
+# - 리터럴 본문 / 공백 (건너뛰기 상태에서 사용)
+SAFE_LITERAL_BODY_PATTERN = re.compile(r'(?:\\[\s\S]|[^"\\\n])*')
+SAFE_SPACE_PATTERN = re.compile(r'\s*')
+
+# 분석 모드
+MODE_REGEX = "regex"
+MODE_SAFE = "safe"
+
+# 건너뛰기 상태: SAFE_MAX_STATEMENT 를 넘어 분류하지 않을 연결 문자열을 버퍼에 담지 않고 읽어 넘김
+SKIP_LITERAL = "literal"  # 문자열 리터럴 본문 안
+SKIP_CHAIN = "chain"      # 닫힌 리터럴 뒤 (공백 다음에 " 가 오면 연결이 이어짐)
+
+# 리터럴 상태
+LITERAL_CLOSED = "closed"    # 닫는 " 까지 매칭
+LITERAL_OPEN = "open"        # 줄바꿈이나 입력 끝까지 닫히지 않음
+LITERAL_PARTIAL = "partial"  # 버퍼 끝에 닿음. 다음 청크를 봐야 알 수 있음
+
+def _safe_literal(buf, pos, eof):
+    """
+    pos 의 " 로 시작하는 문자열 리터럴의 (끝 위치, 상태)를 반환합니다.
+    """
+    match = SAFE_LITERAL_PATTERN.match(buf, pos)
+    end = match.end()
+    if match.group(1):
+        return end, LITERAL_CLOSED
+    # 줄바꿈에서 멈췄거나, 버퍼 끝(또는 끝의 줄 이음 \ 앞)에서 멈춤
+    if eof or buf[end:end + 1] == '\n':
+        return end, LITERAL_OPEN
+    return end, LITERAL_PARTIAL
+
+def _safe_exec_blocks(buf, pos, eof, statements, positions, buf_offset):
+    """
+    buf 의 pos 이후 EXEC SQL 블록을 모으고, 다음 청크에서 다시 볼 위치를 반환합니다.
+    """
+    while True:
+        head = SAFE_EXEC_HEAD_PATTERN.search(buf, pos)
+        if not head:
+            break
+        limit = head.end() + SAFE_MAX_STATEMENT
+        end = buf.find(';', head.end(), limit)
+        if end == -1:
+            if not eof and limit > len(buf):
+                # ; 가 다음 청크에 있을 수 있음
+                return head.start()
+            pos = head.end()
+            continue
+        statements.append(buf[head.end():end])
+        positions.append(buf_offset + head.start())
+        pos = end + 1
+    if not eof:
+        pending = EXEC_SQL_PENDING_PATTERN.search(buf, pos)
+        return pending.start() if pending else len(buf)
+    return pos
+
+def _safe_skip(buf, pos, skip, held, eof, statements, positions):
+    """
+    건너뛰기 상태에서 연결 문자열의 끝까지 읽어 넘기고 (다음 위치, 건너뛰기 상태, 보류 구문)를 반환합니다.
+
+    held 는 상한 안에서 확정된 앞부분 연결 문자열 (SQL, 위치) 입니다. 다음 리터럴이 닫히면 연결이
+    상한을 넘으므로 버리고, 닫히지 않거나 연결이 끝나면 그 자리에서 끝난 연결 문자열로 보고 추가합니다.
+    """
+    while skip:
+        if skip == SKIP_LITERAL:
+            end = SAFE_LITERAL_BODY_PATTERN.match(buf, pos).end()
+            if buf[end:end + 1] == '"':
+                pos, skip, held = end + 1, SKIP_CHAIN, None
+                continue
+            if not eof and buf[end:end + 1] != '\n':
+                return end, skip, held
+            pos, skip = end, None
+        else:
+            end = SAFE_SPACE_PATTERN.match(buf, pos).end()
+            if end == len(buf) and not eof:
+                return end, skip, held
+            if buf.startswith('"', end):
+                pos, skip = end + 1, SKIP_LITERAL
+                continue
+            pos, skip = end, None
+    if held:
+        statements.append(held[0])
+        positions.append(held[1])
+    return pos, None, None
+
+def _safe_string_literals(buf, pos, skip, held, before, eof, statements, positions, buf_offset):
+    """
+    buf 의 pos 이후 문자열 리터럴(연결 문자열 포함)을 모으고, (다음 위치, 건너뛰기 상태, 보류 구문)을 반환합니다.
+    before 는 버퍼 바로 앞의 문자입니다. (문자 리터럴 '"' 판별용)
+    """
+    if skip:
+        pos, skip, held = _safe_skip(buf, pos, skip, held, eof, statements, positions)
+        if skip:
+            return pos, skip, held
+
+    while True:
+        start = buf.find('"', pos)
+        if start == -1:
+            return len(buf), None, None
+        if start + 1 == len(buf) and not eof:
+            return start, None, None
+        # 문자 리터럴 '"' 은 건너뜀
+        prev = buf[start - 1] if start > 0 else before
+        if prev == "'" and buf.startswith("'", start + 1):
+            pos = start + 2
+            continue
+        end, state = _safe_literal(buf, start, eof)
+        if state == LITERAL_OPEN:
+            pos = end
+            continue
+        held = None
+        if state == LITERAL_CLOSED:
+            # 공백만 사이에 두고 이어지는 리터럴을 연결
+            while True:
+                gap = SAFE_SPACE_PATTERN.match(buf, end).end()
+                if gap == len(buf) and not eof:
+                    state, resume, resume_skip = LITERAL_PARTIAL, gap, SKIP_CHAIN
+                    break
+                if not buf.startswith('"', gap):
+                    break
+                next_end, next_state = _safe_literal(buf, gap, eof)
+                if next_state == LITERAL_PARTIAL:
+                    state, resume, resume_skip = LITERAL_PARTIAL, next_end, SKIP_LITERAL
+                    break
+                if next_state == LITERAL_OPEN:
+                    break
+                end = next_end
+            if state == LITERAL_PARTIAL and end - start <= SAFE_MAX_STATEMENT:
+                sql_string = string_literal_sql(buf[start:end])
+                if sql_string is not None:
+                    held = (sql_string, buf_offset + start)
+        else:
+            resume, resume_skip = end, SKIP_LITERAL
+        if state == LITERAL_PARTIAL:
+            # 다음 청크에서 이어짐. 이미 상한을 넘었으면 버퍼에 남기지 않고 끝까지 건너뜀
+            if len(buf) - start > SAFE_MAX_STATEMENT:
+                pos, skip, held = _safe_skip(buf, resume, resume_skip, held, eof, statements, positions)
+                if skip:
+                    return pos, skip, held
+                continue
+            return start, None, None
+        pos = end
+        if end - start > SAFE_MAX_STATEMENT:
+            continue
+        sql_string = string_literal_sql(buf[start:end])
+        if sql_string is not None:
+            statements.append(sql_string)
+            positions.append(buf_offset + start)
+
+def analyze_stream_safe(stream, chunk_size=STREAM_CHUNK_SIZE, locations=None):
+    """
+    analyze_stream() 의 안전 스캐너 버전입니다. 결과 형식은 같습니다.
+
+    정규식 분석이 예산을 넘긴 파일을 다시 분석할 때 사용하며, 파일 길이에 선형으로 동작합니다.
+    버퍼에는 SAFE_MAX_STATEMENT 이하의 미완성 구문만 남기므로 메모리 사용량도 파일 크기와 무관합니다.
+    - EXEC SQL 블록: ; 가 SAFE_MAX_STATEMENT 문자 안에 없으면 해당 블록은 건너뜁니다.
+    - 문자열 리터럴: 줄바꿈 전에 닫히지 않은 리터럴은 건너뜁니다. (C 문법과 같음)
+    - 문자 리터럴('"')의 따옴표는 문자열 시작으로 보지 않습니다.
+
+    Note: 정규식 분석(analyze_content)은 '"' 의 따옴표를 문자열 시작으로 보기 때문에, '"' 가 있는
+    파일에서는 안전 스캐너가 정규식 분석이 놓친 동적 SQL의 테이블을 추가로 찾을 수 있습니다.
+    즉, 안전 스캐너로 다시 분석된 파일은 결과가 정규식 분석과 다를 수 있습니다.
+    """
+    table_ops = defaultdict(int)
+    desc_values = [None] * len(DESC_PATTERNS)
+
+    buf = ""
+    buf_offset = 0 # buf[0] 의 스트림 전체 기준 위치
+    before = ""    # buf 바로 앞의 문자
+    line_index = LineIndex() if locations is not None else None
+    exec_pos = str_pos = desc_pos = 0
+    skip = None   # 상한을 넘은 연결 문자열을 건너뛰는 중이면 SKIP_LITERAL / SKIP_CHAIN
+    held = None   # 건너뛰는 연결 문자열의 확정된 앞부분 (SQL, 위치)
+    eof = False
+
+    while not eof:
+        chunk = stream.read(chunk_size)
+        if chunk:
+            if line_index is not None:
+                line_index.extend(chunk, buf_offset + len(buf))
+            buf += chunk
+        else:
+            eof = True
+
+        desc_pos = scan_descriptions(buf, desc_pos, desc_values, eof)
+
+        statements = []
+        positions = []
+        exec_pos = _safe_exec_blocks(buf, exec_pos, eof, statements, positions, buf_offset)
+        str_pos, skip, held = _safe_string_literals(buf, str_pos, skip, held, before, eof,
+                                                    statements, positions, buf_offset)
+
+        results = classify_statements(statements)
+        merge_statement_results(results, table_ops)
+        if line_index is not None:
+            record_locations(results, positions, line_index, locations)
+
+        # 처리가 끝난 앞부분 버리기
+        consumed = min(exec_pos, str_pos, desc_pos)
+        if consumed:
+            before = buf[consumed - 1]
+            buf = buf[consumed:]
+            buf_offset += consumed
+            if line_index is not None:
+                # 보류 구문의 위치는 아직 변환 전이므로 그 줄부터 유지
+                line_index.trim(min(buf_offset, held[1]) if held else buf_offset)
+            exec_pos -= consumed
+            str_pos -= consumed
+            desc_pos -= consumed
+
+    return table_ops, description_value(desc_values)
+
+def analyze_content_safe(content, locations=None):
+    """
+    소스 문자열을 analyze_stream_safe() 로 분석합니다. (analyze_content() 의 안전 스캐너 버전)
+    """
+    return analyze_stream_safe(io.StringIO(content), chunk_size=max(len(content), 1), locations=locations)
+
+def analyze_file_safe(file_path, encoding='euc-kr', locations=None):
+    """
+    파일을 청크 단위로 읽으며 analyze_stream_safe() 로 분석합니다.
+    """
+    try:
+        with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
+            return analyze_stream_safe(f, locations=locations)
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        return {}, ""
+
+def _worker_main(conn, encoding, stream, location_type, from_text):
+    """
+    워커 프로세스 본체. (index, source, mode) 작업을 받아 (index, 결과) 를 돌려보냅니다.
+    source는 파일 경로이며, from_text=True 이면 분석할 소스 문자열입니다.
+    결과는 ("ok", table_ops, source_desc, locations) 또는 ("error", 메시지) 입니다.
+    """
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        index, source, mode = task
+        locations = location_type() if location_type else None
+        try:
+            if from_text:
+                analyze = analyze_content_safe if mode == MODE_SAFE else analyze_content
+                table_ops, source_desc = analyze(source, locations=locations)
+            elif mode == MODE_SAFE:
+                table_ops, source_desc = analyze_file_safe(source, encoding=encoding, locations=locations)
+            else:
+                table_ops, source_desc = analyze_file(source, encoding=encoding, stream=stream, locations=locations)
+            reply = ("ok", dict(table_ops), source_desc, locations)
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        conn.send((index, reply))
+
+class _Worker:
+    """
+    워커 프로세스 하나와 현재 맡은 작업. 시간 초과 시 restart()로 교체합니다.
+    """
+
+    def __init__(self, ctx, args):
+        self.ctx = ctx
+        self.args = args
+        self.task = None
+        self.started = 0.0
+        self._spawn()
+
+    def _spawn(self):
+        self.conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(target=_worker_main, args=(child_conn,) + self.args, daemon=True)
+        self.process.start()
+        # 자식 쪽 끝은 바로 닫아야 워커가 죽었을 때 recv()가 EOFError로 끝남
+        child_conn.close()
+
+    def assign(self, task):
+        self.conn.send(task)
+        self.task = task
+        self.started = time.monotonic()
+
+    def restart(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.task = None
+        self._spawn()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+def analyze_files_guarded(paths, encoding='euc-kr', stream=False, locations=None,
+                          timeout=DEFAULT_TIMEOUT, max_size=DEFAULT_MAX_SIZE, workers=None,
+                          issues=None):
+    """
+    파일 목록을 워커 프로세스에서 분석하며, 입력 순서대로 (path, table_ops, source_desc, locations)를 생성합니다.
+
+    - timeout: 파일당 분석 시간 예산(초). 넘기면 워커를 종료하고 안전 스캐너로 다시 분석합니다.
+    - max_size: 이보다 큰 파일은 정규식 분석 없이 바로 안전 스캐너로 분석합니다.
+      stream=True 이면 메모리 사용량이 파일 크기와 무관하므로 크기 예산을 적용하지 않고,
+      모든 파일을 analyze_stream() 으로 (시간 예산 안에서) 분석합니다.
+    - locations: 위치 기록용 타입. dict 이면 {(table, op): [(줄, 칼럼), ...]}, FirstLocations 이면
+      테이블별 첫 위치를 파일별로 함께 반환합니다. (None이면 위치를 기록하지 않음)
+    - workers: 워커 프로세스 수 (기본: CPU 수, 최소 1)
+    - issues: 리스트를 넘기면 예산을 넘긴 파일을 (path, reason, outcome) 으로 추가합니다.
+      reason: 'oversize' / 'timeout' / 'crashed' / 'error', outcome: 'safe scanner' / 'failed'
+      안전 스캐너로도 분석하지 못한 파일은 빈 결과로 반환됩니다.
+    """
+    paths = list(paths)
+    if stream:
+        max_size = None
+    sizes = []
+    for path in paths:
+        try:
+            sizes.append(os.path.getsize(path))
+        except OSError:
+            sizes.append(0) # 파일 오류는 워커의 analyze_file()이 보고
+
+    for index, table_ops, source_desc, locs in _run_guarded(
+            paths, paths, sizes, False, encoding, stream, locations,
+            timeout, max_size, workers, issues):
+        yield paths[index], table_ops, source_desc, locs
+
+def analyze_contents_guarded(items, locations=None, timeout=DEFAULT_TIMEOUT,
+                             max_size=DEFAULT_MAX_SIZE, workers=None, issues=None):
+    """
+    메모리에 읽어 둔 소스 문자열을 analyze_files_guarded()와 같은 예산으로 분석합니다. (git blob 등)
+
+    items: (label, content) 의 iterable. 결과와 issues 에는 label 이 사용됩니다.
+    max_size는 문자 수 기준입니다.
+    """
+    items = list(items)
+    labels = [label for label, _ in items]
+    contents = [content for _, content in items]
+
+    for index, table_ops, source_desc, locs in _run_guarded(
+            labels, contents, [len(content) for content in contents], True, None, False, locations,
+            timeout, max_size, workers, issues):
+        yield labels[index], table_ops, source_desc, locs
+
+def _run_guarded(labels, sources, sizes, from_text, encoding, stream, locations,
+                 timeout, max_size, workers, issues):
+    """
+    analyze_files_guarded() / analyze_contents_guarded() 의 본체.
+    입력 순서대로 (index, table_ops, source_desc, locations) 를 생성합니다.
+    """
+    if issues is None:
+        issues = []
+    if not sources:
+        return
+
+    pending = deque()
+    for index, size in enumerate(sizes):
+        if max_size and size > max_size:
+            issues.append((labels[index], "oversize", "safe scanner"))
+            pending.append((index, sources[index], MODE_SAFE))
+        else:
+            pending.append((index, sources[index], MODE_REGEX))
+
+    count = max(1, min(workers or os.cpu_count() or 1, len(sources)))
+    ctx = multiprocessing.get_context()
+    pool = [_Worker(ctx, (encoding, stream, locations, from_text)) for _ in range(count)]
+
+    results = {}
+    next_index = 0
+
+    def fail(task, reason):
+        # 정규식 분석이 실패하면 안전 스캐너로 한 번 더 시도 (대기열 맨 앞)
+        index, source, mode = task
+        label = labels[index]
+        if mode == MODE_REGEX:
+            issues.append((label, reason, "safe scanner"))
+            pending.appendleft((index, source, MODE_SAFE))
+        else:
+            # 이미 보고된 항목이면 결과만 'failed' 로 갱신
+            for i in range(len(issues) - 1, -1, -1):
+                if issues[i][0] == label:
+                    issues[i] = (label, issues[i][1], "failed")
+                    break
+            else:
+                issues.append((label, reason, "failed"))
+            results[index] = ({}, "", locations() if locations else None)
+
+    try:
+        while next_index < len(sources):
+            for worker in pool:
+                if worker.task is None and pending:
+                    worker.assign(pending.popleft())
+
+            busy = [worker for worker in pool if worker.task is not None]
+            deadline = min(worker.started for worker in busy) + timeout if timeout else None
+            ready = wait([worker.conn for worker in busy],
+                         None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+            now = time.monotonic()
+            for worker in busy:
+                task = worker.task
+                if worker.conn in ready or worker.conn.poll():
+                    try:
+                        index, reply = worker.conn.recv()
+                    except (EOFError, OSError):
+                        worker.restart()
+                        fail(task, "crashed")
+                        continue
+                    worker.task = None
+                    if reply[0] == "ok":
+                        results[index] = reply[1:]
+                    else:
+                        fail(task, "error")
+                elif timeout and now - worker.started >= timeout:
+                    worker.restart()
+                    fail(task, "timeout")
+
+            while next_index in results:
+                table_ops, source_desc, locs = results.pop(next_index)
+                yield (next_index, table_ops, source_desc, locs)
+                next_index += 1
+    finally:
+        for worker in pool:
+            worker.stop()
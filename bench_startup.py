@@ -0,0 +1,83 @@
+"""
+proc_analyzer 의 import(기동) 시간을 측정하는 벤치마크 스크립트입니다.
+
+라이브러리로 import 할 때 argparse/glob/openpyxl 같은 무거운 모듈이 로드되지
+않는지 확인하고, 새 인터프리터에서 import 하는 데 걸린 시간을 출력합니다.
+기준을 넘으면 종료 코드 1을 반환하므로 CI 가드로 사용할 수 있습니다.
+
+사용법:
+    python bench_startup.py [-n 반복횟수] [--max-ms 허용시간(ms)]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# 코어 import 시 로드되면 안 되는 모듈
+HEAVY_MODULES = ["argparse", "glob", "openpyxl", "excel_export", "numpy", "multiprocessing", "analyze_guard"]
+
+PROBE = (
+    "import sys, time\n"
+    "t0 = time.perf_counter()\n"
+    "import proc_analyzer\n"
+    "t1 = time.perf_counter()\n"
+    "heavy = [m for m in {heavy!r} if m in sys.modules]\n"
+    "print((t1 - t0) * 1000.0)\n"
+    "print(','.join(heavy))\n"
+)
+
+
+def measure(repeat):
+    """
+    새 파이썬 프로세스에서 proc_analyzer 를 import 하여
+    (import 시간 ms 리스트, 전체 기동 시간 ms 리스트, 로드된 무거운 모듈 집합)을 반환합니다.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = PROBE.format(heavy=HEAVY_MODULES)
+
+    import_times = []
+    total_times = []
+    heavy_loaded = set()
+
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=here, capture_output=True, text=True, check=True
+        ).stdout.splitlines()
+        total_times.append((time.perf_counter() - t0) * 1000.0)
+
+        import_times.append(float(out[0]))
+        if len(out) > 1 and out[1]:
+            heavy_loaded.update(out[1].split(','))
+
+    return import_times, total_times, heavy_loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="proc_analyzer startup benchmark")
+    parser.add_argument("-n", "--repeat", type=int, default=10, help="Number of runs (default: 10)")
+    parser.add_argument("--max-ms", type=float, default=50.0, help="Max allowed median import time in ms (default: 50)")
+    args = parser.parse_args()
+
+    import_times, total_times, heavy_loaded = measure(args.repeat)
+    import_times.sort()
+    total_times.sort()
+    median_import = import_times[len(import_times) // 2]
+    median_total = total_times[len(total_times) // 2]
+
+    print(f"import proc_analyzer : median {median_import:.2f} ms (min {import_times[0]:.2f} ms)")
+    print(f"process startup      : median {median_total:.2f} ms (min {total_times[0]:.2f} ms)")
+
+    failed = False
+    if heavy_loaded:
+        print(f"[FAIL] heavy modules loaded on import: {', '.join(sorted(heavy_loaded))}")
+        failed = True
+    if median_import > args.max_ms:
+        print(f"[FAIL] median import time {median_import:.2f} ms exceeds {args.max_ms:.2f} ms")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("[OK] startup guard passed")
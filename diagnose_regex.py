@@ -5,6 +5,8 @@ import re
 import signal
 import sys
 
+from proc_analyzer import LineIndex
+
 # 타임아웃 처리 (Windows에서는 signal.alarm 불가, 별도 처리 필요)
 
 with open('SC_MOG_COMMON_utf8.pc', 'r', encoding='utf-8') as f:
@@ -38,6 +40,7 @@ print("(행이 걸리면 catastrophic backtracking 의심)")
 sys.stdout.flush()
 
 matches = list(func_pattern.finditer(content))
+line_index = LineIndex(content)
 print(f"\n총 {len(matches)}개 매칭 발견:")
 
 for i, m in enumerate(matches):
@@ -46,7 +49,7 @@ for i, m in enumerate(matches):
     type_first_word = type_str.split()[0]
     
     # 매칭 위치의 줄 번호 계산
-    line_num = content[:m.start()].count('\n') + 1
+    line_num, _ = line_index.locate(m.start())
     
     is_filtered = name in RESERVED_WORDS or type_first_word in RESERVED_WORDS
     status = "FILTERED" if is_filtered else "ACCEPTED"
@@ -0,0 +1,78 @@
+"""
+proc_analyzer 분석 결과를 엑셀 파일로 저장하는 모듈입니다.
+
+openpyxl은 import 비용이 크므로 이 모듈은 엑셀 출력(-e)이 요청된 경우에만
+proc_analyzer.main()에서 지연 import 됩니다.
+"""
+from openpyxl import Workbook
+from openpyxl.styles import Alignment
+
+HEADER = ["Source Name", "Source Desc.", "Table Name", "CRUD Operations", "Line", "Column"]
+
+
+def export_excel(all_results, excel_path, merge=False):
+    """
+    분석 결과 목록을 엑셀 파일로 저장합니다.
+
+    all_results: (filename, source_desc, table, operations, line, column) 튜플의 리스트
+    line/column은 테이블이 처음 등장한 구문의 위치입니다.
+    merge: True이면 Source Name / Source Desc. 이 같은 셀을 병합합니다.
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Analysis Result"
+
+    # Header
+    ws.append(HEADER)
+
+    # Data
+    # Sort mainly for merging logic (though processing order might be enough, safety first)
+    # But here we process file by file, so it's naturally sorted by file processing order.
+
+    start_row = 2 # Data starts from row 2
+    for row in all_results:
+        ws.append(row)
+
+    last_row = ws.max_row
+
+    # Merging Logic
+    if merge and last_row >= start_row:
+        # Iterate to find ranges to merge
+        # We need to merge Column 1 (Source Name) and Column 2 (Source Desc.)
+
+        # Helper to merge a specific column
+        def merge_column(col_idx):
+            current_val = ws.cell(row=start_row, column=col_idx).value
+            merge_start = start_row
+
+            for r in range(start_row + 1, last_row + 2): # Go one past end to handle last block
+                val = ws.cell(row=r, column=col_idx).value if r <= last_row else None
+
+                if val != current_val:
+                    # End of a block
+                    if r - 1 > merge_start:
+                        ws.merge_cells(start_row=merge_start, start_column=col_idx, end_row=r-1, end_column=col_idx)
+                        # Center alignment for merged cells
+                        cell = ws.cell(row=merge_start, column=col_idx)
+                        cell.alignment = Alignment(vertical='center', horizontal='center')
+
+                    current_val = val
+                    merge_start = r
+
+        merge_column(1) # Source Name
+        merge_column(2) # Source Desc.
+
+    # Auto-adjust column width (simple approximation)
+    for col in ws.columns:
+        max_length = 0
+        column = col[0].column_letter # Get the column name
+        for cell in col:
+            try:
+                if len(str(cell.value)) > max_length:
+                    max_length = len(cell.value)
+            except:
+                pass
+        adjusted_width = (max_length + 2)
+        ws.column_dimensions[column].width = adjusted_width
+
+    wb.save(excel_path)
@@ -0,0 +1,168 @@
+"""
+두 git 리비전 사이에서 변경된 *.pc 파일만 분석하여 테이블 CRUD 변화를 구하는 모듈입니다.
+
+로컬 git 명령(plumbing)만 사용하며 네트워크에 접근하지 않습니다.
+- git diff --raw : 변경된 파일과 이전/이후 blob id 목록
+- git cat-file --batch : blob 내용을 하나의 프로세스로 순차 조회
+"""
+import io
+import subprocess
+
+from analyze_guard import DEFAULT_MAX_SIZE, DEFAULT_TIMEOUT, analyze_contents_guarded
+from proc_analyzer import analyze_content, mask_to_ops
+
+# git에서 '파일 없음'을 나타내는 blob id (추가/삭제된 파일의 한쪽)
+NULL_SHA = "0" * 40
+
+
+def _run_git(repo, args):
+    """
+    git 명령을 실행하고 stdout(bytes)을 반환합니다. 실패하면 RuntimeError를 발생시킵니다.
+    """
+    try:
+        proc = subprocess.run(["git", "-C", repo] + args, capture_output=True)
+    except FileNotFoundError:
+        raise RuntimeError("'git' command not found")
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.decode(errors='replace').strip())
+    return proc.stdout
+
+
+def list_changed_files(base, head, repo="."):
+    """
+    base..head 사이에 변경된 *.pc 파일 목록을 반환합니다.
+
+    반환값: (path, status, old_sha, new_sha) 튜플의 리스트
+    status는 A(추가), D(삭제), M(수정), T(타입 변경) 중 하나이며,
+    이름 변경은 삭제 + 추가로 취급합니다.
+    """
+    out = _run_git(repo, [
+        "diff", "--raw", "-z", "--no-renames", "--abbrev=40",
+        base, head, "--", ":(top,glob)**/*.pc"
+    ])
+
+    # -z 출력 형식: ":<old mode> <new mode> <old sha> <new sha> <status>\0<path>\0"
+    fields = out.split(b"\0")
+    changed = []
+    for i in range(0, len(fields) - 1, 2):
+        meta = fields[i].decode().lstrip(":").split()
+        if len(meta) < 5:
+            continue
+        path = fields[i + 1].decode(errors='surrogateescape')
+        changed.append((path, meta[4][0], meta[2], meta[3]))
+    return changed
+
+
+def read_blobs(shas, repo="."):
+    """
+    blob id 목록의 내용을 읽어 {sha: bytes} 딕셔너리로 반환합니다.
+    git cat-file --batch 프로세스 하나에 id를 하나씩 보내고 응답을 바로 읽으므로
+    blob 개수가 많아도 파이프가 막히지 않습니다.
+    """
+    blobs = {}
+    wanted = [sha for sha in dict.fromkeys(shas) if sha != NULL_SHA]
+    if not wanted:
+        return blobs
+
+    try:
+        proc = subprocess.Popen(
+            ["git", "-C", repo, "cat-file", "--batch"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+    except FileNotFoundError:
+        raise RuntimeError("'git' command not found")
+
+    try:
+        for sha in wanted:
+            proc.stdin.write(sha.encode() + b"\n")
+            proc.stdin.flush()
+
+            # 응답 헤더: "<sha> <type> <size>\n" 또는 "<sha> missing\n"
+            header = proc.stdout.readline().split()
+            if len(header) != 3:
+                raise RuntimeError(f"Cannot read git object: {sha}")
+            size = int(header[2])
+            blobs[sha] = proc.stdout.read(size)
+            proc.stdout.read(1) # 내용 뒤의 줄바꿈
+    finally:
+        proc.stdin.close()
+        proc.wait()
+
+    return blobs
+
+
+def _decode_blob(data, encoding):
+    """
+    blob 내용을 파일과 같은 방식(errors='ignore', 줄바꿈 변환)으로 디코딩합니다.
+    """
+    if data is None:
+        return ""
+    return io.TextIOWrapper(io.BytesIO(data), encoding=encoding, errors='ignore').read()
+
+def _analyze_blob(data, encoding):
+    """
+    blob 내용을 디코딩하여 분석합니다.
+    """
+    if data is None:
+        return {}
+    table_ops, _ = analyze_content(_decode_blob(data, encoding))
+    return table_ops
+
+
+def diff_table_ops(old_ops, new_ops):
+    """
+    두 분석 결과(table -> CRUD 마스크)를 비교하여 추가/삭제된 (table, op) 쌍을 반환합니다.
+    """
+    added = []
+    removed = []
+    for table in sorted(old_ops.keys() | new_ops.keys()):
+        old_mask = old_ops.get(table, 0)
+        new_mask = new_ops.get(table, 0)
+        if old_mask == new_mask:
+            continue
+        added.extend((table, op) for op in mask_to_ops(new_mask & ~old_mask))
+        removed.extend((table, op) for op in mask_to_ops(old_mask & ~new_mask))
+    return added, removed
+
+
+def analyze_git_changes(base, head="HEAD", repo=".", encoding='euc-kr',
+                        timeout=DEFAULT_TIMEOUT, max_size=DEFAULT_MAX_SIZE, workers=None, issues=None):
+    """
+    base..head 사이에 변경된 *.pc 파일의 이전/이후 내용을 분석하여 CRUD 변화를 구합니다.
+
+    반환값: (path, status, added, removed) 튜플의 리스트 (경로 순)
+    added/removed는 (table, op) 쌍의 정렬된 리스트입니다.
+
+    blob 분석에는 analyze_guard 와 같은 시간/크기 예산을 적용합니다. (timeout=0 이면 예산 없이 순차 분석)
+    예산을 넘긴 blob은 issues 에 ('path@revision', reason, outcome) 으로 추가됩니다.
+    """
+    changed = sorted(list_changed_files(base, head, repo=repo))
+    blobs = read_blobs(
+        [sha for _, _, old_sha, new_sha in changed for sha in (old_sha, new_sha)],
+        repo=repo
+    )
+
+    # 같은 내용(blob)은 한 번만 분석. 보고용 이름은 처음 나온 'path@revision'
+    labels = {}
+    for path, _, old_sha, new_sha in changed:
+        for sha, rev in ((old_sha, base), (new_sha, head)):
+            if sha != NULL_SHA and sha not in labels:
+                labels[sha] = f"{path}@{rev}"
+
+    blob_ops = {NULL_SHA: {}}
+    if timeout:
+        items = ((labels[sha], _decode_blob(blobs.get(sha), encoding)) for sha in labels)
+        analyzed = analyze_contents_guarded(
+            items, timeout=timeout, max_size=max_size, workers=workers, issues=issues
+        )
+        for sha, (_, table_ops, _, _) in zip(labels, analyzed):
+            blob_ops[sha] = table_ops
+    else:
+        for sha in labels:
+            blob_ops[sha] = _analyze_blob(blobs.get(sha), encoding)
+
+    results = []
+    for path, status, old_sha, new_sha in changed:
+        added, removed = diff_table_ops(blob_ops[old_sha], blob_ops[new_sha])
+        results.append((path, status, added, removed))
+    return results
@@ -1,13 +1,120 @@
 import re
 import sys
 import os
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
+from itertools import accumulate
+from operator import add
 
-def analyze_file(file_path, encoding='euc-kr'):
+# CRUD 작업 비트 플래그 (테이블별 작업을 4비트 마스크로 표현)
+CRUD_OPS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+OP_BITS = {op: 1 << i for i, op in enumerate(CRUD_OPS)}
+
+def mask_to_ops(mask):
+    """
+    4비트 마스크를 CRUD 작업 이름 리스트(알파벳 순)로 변환합니다. 예: 0b0101 -> ['SELECT', 'UPDATE']
+    """
+    return sorted(op for op in CRUD_OPS if mask & OP_BITS[op])
+
+# 마스크별 출력 문자열 (16가지). 출력 시점에만 문자열로 변환하기 위해 미리 만들어 둠
+MASK_LABELS = tuple(", ".join(mask_to_ops(mask)) for mask in range(1 << len(CRUD_OPS)))
+MASK_OPS = tuple(tuple(mask_to_ops(mask)) for mask in range(1 << len(CRUD_OPS)))
+
+def intern_table(name):
+    """
+    테이블명을 정규화(NHPT. 스키마 제거)하고 intern 하여 반환합니다.
+    같은 테이블명은 모든 파일에서 하나의 문자열 객체를 공유합니다.
+    """
+    if name.startswith("NHPT."):
+        name = name.replace("NHPT.", "")
+    return sys.intern(name)
+
+# 프로그램명 / 설명 추출 패턴
+# 우선순위: 프로그램명 -> 파일명(한글) -> Description
+DESC_PATTERNS = [
+    re.compile(r'프로그램\s*명\s*:\s*(.*)', re.IGNORECASE),      # 프로그램 명 : ...
+    re.compile(r'기\s*능\s*:\s*(.*)', re.IGNORECASE),            # 기    능 : ...
+    re.compile(r'파일명\s*\(\s*한글\s*\)\s*:\s*(.*)', re.IGNORECASE),  # 파일명(한글) : ...
+    re.compile(r'Description\s*:\s*(.*)', re.IGNORECASE),      # Description : ...
+    re.compile(r'Descritpion\s*:\s*(.*)', re.IGNORECASE)      # Descritpion : ...
+]
+
+# EXEC SQL 블록 (정적 쿼리)
+# exec sql 로 시작하고 ; 로 끝나는 블록을 찾음 (줄바꿈 포함)
+EXEC_SQL_PATTERN = re.compile(r'EXEC\s+SQL\s+(.*?);', re.DOTALL | re.IGNORECASE)
+
+# 문자열 리터럴 (동적 쿼리)
+# C언어 스타일의 문자열 연결(String Concatenation)을 처리합니다.
+# 예: "SELECT * " \n " FROM TB_TEST" -> "SELECT *  FROM TB_TEST"
+
+# 패턴 설명:
+# "..." : 첫 번째 문자열 (이스케이프 문자 처리 포함)
+# (?:\s*"...")* : 공백(줄바꿈 포함) 후 이어지는 문자열들이 0개 이상 반복
+CONCAT_STRING_PATTERN = re.compile(r'("(?:\\[\s\S]|[^"\\])*"(?:\s*"(?:\\[\s\S]|[^"\\])*")*)')
+SINGLE_STR_PATTERN = re.compile(r'"((?:\\[\s\S]|[^"\\])*)"')
+
+# 스트리밍 모드에서 청크 경계에 걸친 구문을 판별하기 위한 패턴
+# - EXEC SQL 시작부는 있으나 ; 가 아직 없는 블록, 또는 버퍼 끝에 걸린 'EXEC SQL' 의 앞부분
+EXEC_SQL_PENDING_PATTERN = re.compile(
+    r'EXEC\s+SQL\s+|E(?:X(?:E(?:C(?:\s+(?:S(?:Q(?:L\s*)?)?)?)?)?)?)?\Z',
+    re.IGNORECASE
+)
+# - 연결 문자열 뒤에 공백이 아닌 다른 문자가 오면 더 이상 연결될 수 없음
+STRING_CHAIN_END_PATTERN = re.compile(r'\s*[^"\s]')
+# - 버퍼의 마지막 공백이 아닌 문자
+LAST_TEXT_PATTERN = re.compile(r'\S\s*\Z')
+
+# 스트리밍 모드 기본 청크 크기 (문자 수)
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+class LineIndex:
+    """
+    텍스트의 줄 시작 위치(offset) 배열. 위치 -> (줄, 칼럼) 변환을 bisect로 O(log n)에 수행합니다.
+    (content[:pos].count('\\n') 처럼 매번 앞부분을 다시 세지 않음)
+
+    스트리밍 모드에서는 extend()로 청크를 이어 붙이고 trim()으로 처리가 끝난 앞부분을 버려
+    버퍼 크기만큼의 줄 정보만 유지합니다.
+    """
+
+    def __init__(self, text=""):
+        self.starts = [0]    # 줄 시작 위치 (전체 텍스트 기준)
+        self.first_line = 1  # starts[0] 의 줄 번호
+        self.extend(text, 0)
+
+    def extend(self, text, offset):
+        """
+        전체 텍스트의 offset 위치부터 이어지는 text의 줄 시작 위치를 추가합니다.
+        """
+        parts = text.split('\n')
+        if len(parts) > 1:
+            # k번째 줄바꿈 다음 위치 = offset + (앞선 줄 길이 합) + k
+            line_ends = accumulate(map(len, parts[:-1]))
+            self.starts.extend(map(add, line_ends, range(offset + 1, offset + len(parts))))
+
+    def trim(self, offset):
+        """
+        offset 이전에 끝난 줄 정보를 버립니다. (offset이 속한 줄은 유지)
+        """
+        k = bisect_right(self.starts, offset) - 1
+        if k > 0:
+            del self.starts[:k]
+            self.first_line += k
+
+    def locate(self, pos):
+        """
+        위치를 (줄, 칼럼) 으로 변환합니다. 둘 다 1부터 시작합니다.
+        """
+        k = bisect_right(self.starts, pos) - 1
+        return self.first_line + k, pos - self.starts[k] + 1
+
+def analyze_file(file_path, encoding='euc-kr', stream=False, locations=None):
     """
     Pro*C 파일을 분석하여 TB_로 시작하는 테이블과 CRUD 작업을 추출합니다.
     EXEC SQL 블록과 문자열 리터럴(동적 쿼리)을 모두 분석합니다.
     추가로 '프로그램명 : ...' 패턴을 찾아 설명을 추출합니다.
+    stream=True 이면 파일 전체를 메모리에 올리지 않고 analyze_stream()으로 분석합니다.
+    locations에 딕셔너리를 넘기면 {(table, op): [(줄, 칼럼), ...]} 형태로 구문 위치를 기록합니다.
+    (FirstLocations를 넘기면 테이블별 첫 위치만 기록)
     """
     if not os.path.exists(file_path):
         print(f"Error: File not found - {file_path}")
@@ -15,77 +122,322 @@ def analyze_file(file_path, encoding='euc-kr'):
 
     try:
         with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
+            if stream:
+                return analyze_stream(f, locations=locations)
             content = f.read()
     except Exception as e:
         print(f"Error reading file: {e}")
         return {}, ""
 
-    table_ops = defaultdict(set)
-    source_desc = ""
+    return analyze_content(content, locations=locations)
+
+def analyze_content(content, locations=None):
+    """
+    메모리에 읽어 둔 Pro*C 소스 문자열을 분석합니다. analyze_file()의 분석 본체입니다.
+    (git blob 등 파일 경로가 없는 소스를 분석할 때 사용)
+    """
+    table_ops = defaultdict(int)
 
     # 0. 프로그램명 / 설명 추출
-    # 우선순위: 프로그램명 -> 파일명(한글) -> Description
-    patterns = [
-        r'프로그램\s*명\s*:\s*(.*)',      # 프로그램 명 : ...
-        r'기\s*능\s*:\s*(.*)',            # 기    능 : ...
-        r'파일명\s*\(\s*한글\s*\)\s*:\s*(.*)',  # 파일명(한글) : ...
-        r'Description\s*:\s*(.*)',      # Description : ...
-        r'Descritpion\s*:\s*(.*)'      # Descritpion : ...
-    ]
-    
-    for pat in patterns:
-        match = re.search(pat, content, re.IGNORECASE)
+    source_desc = ""
+    for pat in DESC_PATTERNS:
+        match = pat.search(content)
         if match:
             extracted = match.group(1).strip()
             if extracted:
                 source_desc = extracted
                 break
     
-    # 1. EXEC SQL 블록 분석 (정적 쿼리)
-    # exec sql 로 시작하고 ; 로 끝나는 블록을 찾음 (줄바꿈 포함)
-    exec_sql_pattern = re.compile(r'EXEC\s+SQL\s+(.*?);', re.DOTALL | re.IGNORECASE)
+    # 파일 내 모든 SQL 문을 모아 한 번에 분류
+    statements = []
+    positions = [] # 문장 시작 위치 (EXEC 키워드 / 첫 번째 따옴표)
 
-    for match in exec_sql_pattern.finditer(content):
-        sql_block = match.group(1)
-        extract_table_crud(sql_block, table_ops, source="STATIC")
+    # 1. EXEC SQL 블록 분석 (정적 쿼리)
+    for match in EXEC_SQL_PATTERN.finditer(content):
+        statements.append(match.group(1))
+        positions.append(match.start())
 
     # 2. 문자열 리터럴 분석 (동적 쿼리)
-    # C언어 스타일의 문자열 연결(String Concatenation)을 처리합니다.
-    # 예: "SELECT * " \n " FROM TB_TEST" -> "SELECT *  FROM TB_TEST"
-    
-    # 패턴 설명:
-    # "..." : 첫 번째 문자열 (이스케이프 문자 처리 포함)
-    # (?:\s*"...")* : 공백(줄바꿈 포함) 후 이어지는 문자열들이 0개 이상 반복
-    concat_string_pattern = re.compile(r'("(?:\\[\s\S]|[^"\\])*"(?:\s*"(?:\\[\s\S]|[^"\\])*")*)')
+    for match in CONCAT_STRING_PATTERN.finditer(content):
+        sql_string = string_literal_sql(match.group(1))
+        if sql_string is not None:
+            statements.append(sql_string)
+            positions.append(match.start())
+
+    results = classify_statements(statements)
+    merge_statement_results(results, table_ops)
+    if locations is not None:
+        record_locations(results, positions, LineIndex(content), locations)
+    return table_ops, source_desc
+
+def merge_statement_results(results, table_ops):
+    """
+    classify_statements() 결과를 table_ops에 비트 OR로 누적합니다.
+    """
+    for result in results:
+        for table, mask in result:
+            table_ops[table] |= mask
+
+class FirstLocations(dict):
+    """
+    테이블별 첫 등장 위치 {table: (줄, 칼럼)} 만 유지하는 위치 기록용 딕셔너리.
+    analyze_*() 의 locations 로 넘기면 (table, op) 별 전체 위치 목록 대신 이 형태로 기록하므로
+    메모리 사용량이 구문 수가 아니라 테이블 수에 비례합니다. (콘솔/엑셀 출력용)
+    """
+    # CLI 실행 시 __main__ 과 proc_analyzer 모듈의 클래스가 달라지므로 isinstance 대신 이 표시로 구분
+    first_only = True
+
+def record_locations(results, positions, line_index, locations):
+    """
+    문장별 분류 결과에 문장 시작 위치의 (줄, 칼럼)을 붙여 locations[(table, op)] 목록에 추가합니다.
+    locations가 FirstLocations이면 테이블별로 가장 앞선 위치만 남깁니다.
+    """
+    first_only = getattr(locations, 'first_only', False)
+    for result, pos in zip(results, positions):
+        if not result:
+            continue
+        loc = line_index.locate(pos)
+        for table, mask in result:
+            if first_only:
+                prev = locations.get(table)
+                if prev is None or loc < prev:
+                    locations[table] = loc
+                continue
+            for op in MASK_OPS[mask]:
+                locations.setdefault((table, op), []).append(loc)
+
+def first_locations(locations):
+    """
+    locations 에서 테이블별 첫 등장 위치 {table: (줄, 칼럼)} 를 구합니다.
+    """
+    if getattr(locations, 'first_only', False):
+        return locations
+    first = {}
+    for (table, _), locs in locations.items():
+        loc = min(locs)
+        if table not in first or loc < first[table]:
+            first[table] = loc
+    return first
+
+def string_literal_sql(full_match):
+    """
+    연결된 C 문자열 리터럴("..." "...")을 하나의 SQL 문자열로 합칩니다.
+    TB_, ATA_, EM_ 테이블이 없으면 None을 반환합니다.
+    """
+    # 연결된 문자열들을 하나로 합치기
+    # 1. 각 "..." 블록을 찾음
+    parts = SINGLE_STR_PATTERN.findall(full_match)
     
-    for match in concat_string_pattern.finditer(content):
-        full_match = match.group(1)
+    if parts:
+        # 2. 하나의 문자열로 결합 (공백 하나로 구분하여 안전하게 연결)
+        sql_string = " ".join(parts)
         
-        # 연결된 문자열들을 하나로 합치기
-        # 1. 각 "..." 블록을 찾음
-        single_str_pattern = re.compile(r'"((?:\\[\s\S]|[^"\\])*)"')
-        parts = single_str_pattern.findall(full_match)
+        # C-style escape sequence handling (\n, \r, \t -> space)
+        # Literal backslash + n/r/t in the source string becomes literal characters in sql_string
+        # We replace them with space to allow regex \s+ to match
+        sql_string = re.sub(r'\\[nrt]', ' ', sql_string)
         
-        if parts:
-            # 2. 하나의 문자열로 결합 (공백 하나로 구분하여 안전하게 연결)
-            sql_string = " ".join(parts)
-            
-            # C-style escape sequence handling (\n, \r, \t -> space)
-            # Literal backslash + n/r/t in the source string becomes literal characters in sql_string
-            # We replace them with space to allow regex \s+ to match
-            sql_string = re.sub(r'\\[nrt]', ' ', sql_string)
-            
-            # 문자열 안에 TB_, ATA_, EM_ 테이블이 있는지 확인
-            if any(prefix in sql_string for prefix in ["TB_", "ATA_", "EM_"]):
-                extract_table_crud(sql_string, table_ops, source="DYNAMIC")
+        # 문자열 안에 TB_, ATA_, EM_ 테이블이 있는지 확인
+        if any(prefix in sql_string for prefix in ["TB_", "ATA_", "EM_"]):
+            return sql_string
+    return None
 
-    return table_ops, source_desc
+def analyze_stream(stream, chunk_size=STREAM_CHUNK_SIZE, locations=None):
+    """
+    텍스트 스트림(파일 객체, 표준입력 등)을 청크 단위로 읽으면서 analyze_file()과 같은 분석을 수행합니다.
 
-def extract_table_crud(sql_text, table_ops, source="UNKNOWN"):
+    청크 경계에 걸친 EXEC SQL 블록과 연결 문자열은 완성될 때까지 버퍼에 남겨 두고,
+    처리가 끝난 앞부분은 버립니다. 따라서 메모리 사용량은 파일 크기가 아니라
+    가장 긴 단일 구문(EXEC SQL 블록, 문자열 연결, 설명 라인)의 크기에 비례합니다.
+
+    locations는 analyze_file()과 같으며, 줄 정보도 버퍼 범위만큼만 유지합니다.
+
+    Note: 설명 패턴이 세 줄 이상에 걸쳐(예: '프로그램\\n명\\n:') 청크 경계에 놓이는 경우는 인식하지 못할 수 있습니다.
     """
-    SQL 텍스트(또는 문자열)에서 TB_, ATA_, EM_ 테이블과 CRUD 키워드를 추출하여 table_ops에 저장합니다.
-    단어 유무만 확인하는 것이 아니라, 문맥(INSERT INTO, UPDATE, FROM 등)을 고려하여
-    정확한 CRUD 작업을 식별합니다.
+    table_ops = defaultdict(int)
+
+    # 설명 패턴별 첫 매칭 값 (None: 아직 못 찾음)
+    desc_values = [None] * len(DESC_PATTERNS)
+
+    buf = ""
+    buf_offset = 0 # buf[0] 의 스트림 전체 기준 위치
+    line_index = LineIndex() if locations is not None else None
+    exec_pos = 0  # 다음 EXEC SQL 탐색 시작 위치
+    str_pos = 0   # 다음 문자열 리터럴 탐색 시작 위치
+    desc_pos = 0  # 다음 설명 패턴 탐색 시작 위치
+    eof = False
+
+    while not eof:
+        chunk = stream.read(chunk_size)
+        if chunk:
+            if line_index is not None:
+                line_index.extend(chunk, buf_offset + len(buf))
+            buf += chunk
+        else:
+            eof = True
+
+        # 0. 프로그램명 / 설명 추출
+        desc_pos = scan_descriptions(buf, desc_pos, desc_values, eof)
+
+        # 청크에서 완성된 SQL 문을 모아 한 번에 분류
+        statements = []
+        positions = []
+
+        # 1. EXEC SQL 블록 분석 (정적 쿼리)
+        # 매칭된 블록은 ; 까지 완성된 것이므로 바로 처리
+        for match in EXEC_SQL_PATTERN.finditer(buf, exec_pos):
+            statements.append(match.group(1))
+            positions.append(buf_offset + match.start())
+            exec_pos = match.end()
+        if not eof:
+            pending = EXEC_SQL_PENDING_PATTERN.search(buf, exec_pos)
+            exec_pos = pending.start() if pending else len(buf)
+
+        # 2. 문자열 리터럴 분석 (동적 쿼리)
+        # 연결 문자열 뒤에 공백만 있거나 닫히지 않은 " 가 오면 다음 청크에서 더 이어질 수 있음
+        for match in CONCAT_STRING_PATTERN.finditer(buf, str_pos):
+            if not eof and not STRING_CHAIN_END_PATTERN.match(buf, match.end()):
+                break
+            sql_string = string_literal_sql(match.group(1))
+            if sql_string is not None:
+                statements.append(sql_string)
+                positions.append(buf_offset + match.start())
+            str_pos = match.end()
+        if not eof:
+            pending = buf.find('"', str_pos)
+            str_pos = pending if pending != -1 else len(buf)
+
+        results = classify_statements(statements)
+        merge_statement_results(results, table_ops)
+        if line_index is not None:
+            record_locations(results, positions, line_index, locations)
+
+        # 처리가 끝난 앞부분 버리기
+        consumed = min(exec_pos, str_pos, desc_pos)
+        if consumed:
+            buf = buf[consumed:]
+            buf_offset += consumed
+            if line_index is not None:
+                line_index.trim(buf_offset)
+            exec_pos -= consumed
+            str_pos -= consumed
+            desc_pos -= consumed
+
+    return table_ops, description_value(desc_values)
+
+def scan_descriptions(buf, desc_pos, desc_values, eof):
+    """
+    스트리밍 버퍼의 desc_pos 이후에서 설명 패턴을 찾아 desc_values(패턴별 첫 매칭 값)를 채우고,
+    다음 청크에서 다시 볼 위치를 반환합니다.
+
+    (.*) 가 줄 끝(\n)에서 끝난 매칭만 확정하며, 버퍼 끝에 닿은 매칭은 다음 청크에서 다시 확인합니다.
+    """
+    # 값이 있는 가장 우선순위 높은 패턴의 인덱스. 이보다 낮은 우선순위 패턴은 더 볼 필요 없음
+    desc_best = next((i for i, value in enumerate(desc_values) if value), len(desc_values))
+
+    pending_desc = len(buf)
+    for i in range(desc_best):
+        if desc_values[i] is not None:
+            continue
+        match = DESC_PATTERNS[i].search(buf, desc_pos)
+        if not match:
+            continue
+        if not eof and match.end() >= len(buf):
+            pending_desc = min(pending_desc, match.start())
+            continue
+        desc_values[i] = match.group(1).strip()
+        if desc_values[i]:
+            desc_best = i
+    if desc_best == 0:
+        return len(buf)
+    if not eof:
+        # 마지막으로 내용이 있는 줄부터 남겨 둠 (키워드와 값이 줄바꿈으로 나뉜 경우 대응)
+        last_text = LAST_TEXT_PATTERN.search(buf, desc_pos)
+        last_line = buf.rfind('\n', 0, last_text.start()) + 1 if last_text else len(buf)
+        desc_pos = min(pending_desc, max(desc_pos, last_line))
+    return desc_pos
+
+def description_value(desc_values):
+    """
+    패턴 우선순위 순으로 값이 있는 첫 설명을 반환합니다.
+    """
+    for value in desc_values:
+        if value:
+            return value
+    return ""
+
+# 테이블 패턴 (스키마 포함)
+TABLE_PATTERN = re.compile(r'\b((?:[A-Z0-9_]+\.)?(?:TB_|ATA_|EM_)[A-Z0-9_]+)\b')
+
+# CRUD 타겟 패턴 정의
+# INSERT INTO Table
+INSERT_PATTERN = re.compile(r'INSERT\s+INTO\s+((?:[A-Z0-9_]+\.)?(?:TB_|ATA_|EM_)[A-Z0-9_]+)')
+# INSERT Columns Pattern: INSERT INTO Table (...)
+# 괄호 안의 내용을 비글리디 하게 잡되, 줄바꿈 포함
+# (일괄 분류 시 문장 구분자 '\0'을 넘어가지 않도록 [^\0] 사용)
+INSERT_COLUMNS_PATTERN = re.compile(r'INSERT\s+INTO\s+[A-Z0-9_.]+\s*\(([^\0]*?)\)')
+# UPDATE Table
+UPDATE_PATTERN = re.compile(r'UPDATE\s+((?:[A-Z0-9_]+\.)?(?:TB_|ATA_|EM_)[A-Z0-9_]+)')
+# DELETE [FROM] Table
+DELETE_PATTERN = re.compile(r'DELETE\s+(?:FROM\s+)?((?:[A-Z0-9_]+\.)?(?:TB_|ATA_|EM_)[A-Z0-9_]+)')
+
+# SELECT 소스 판별용 구조 토큰: FROM, JOIN, ',', INSERT, UPDATE, DELETE, SET, WHERE, SELECT, '(', ')'
+CONTEXT_TOKEN_PATTERN = re.compile(r'\b(FROM|JOIN|UPDATE|INSERT|DELETE|SELECT|SET|WHERE|GROUP|ORDER|HAVING|VALUES)\b|[,()]', re.IGNORECASE)
+CLAUSE_STOP_TOKENS = frozenset(('UPDATE', 'INSERT', 'DELETE', 'SELECT', 'SET', 'WHERE', 'GROUP', 'ORDER', 'HAVING', 'VALUES'))
+CONTEXT_TOKENS = CLAUSE_STOP_TOKENS | {'FROM', 'JOIN', ',', '(', ')'}
+
+# MERGE 문: 문장 첫 키워드가 MERGE 인 경우만 (테이블/컬럼명 안의 'MERGE' 문자열은 제외)
+# 앞쪽의 -- 줄 주석과 EXEC SQL AT <db> / FOR <호스트 변수> 절은 건너뜀
+MERGE_STATEMENT_PATTERN = re.compile(
+    r'\s*(?:(?:--[^\n]*|AT\s+:?\w+\b|FOR\s+:?\w+\b)\s*)*(?P<merge>MERGE)\b'
+)
+# PL/SQL 블록 (EXEC SQL EXECUTE BEGIN ... END; / 동적 쿼리 "BEGIN ... END;" / DECLARE ...)
+PLSQL_BLOCK_PATTERN = re.compile(
+    r'\s*(?:(?:--[^\n]*|AT\s+:?\w+\b|FOR\s+:?\w+\b)\s*)*(?:EXECUTE|BEGIN|DECLARE)\b'
+)
+# PL/SQL 블록 안의 MERGE 문: 블록 시작(BEGIN 등), ; 또는 IF/LOOP 분기 바로 뒤의 MERGE 키워드
+PLSQL_MERGE_PATTERN = re.compile(
+    r'(?:;|\b(?:EXECUTE|BEGIN|DECLARE|THEN|ELSE|LOOP)\b)\s*(?:--[^\n]*\s*)*(?P<merge>MERGE)\b'
+)
+# MERGE 문 토큰: 테이블, MERGE 구조 키워드 + 구조 토큰을 한 번에 스캔
+MERGE_TOKEN_PATTERN = re.compile(
+    r'(?P<table>\b(?:[A-Z0-9_]+\.)?(?:TB_|ATA_|EM_)[A-Z0-9_]+\b)'
+    r'|\b(?P<tok>MERGE|INTO|USING|WHEN|THEN|FROM|JOIN|UPDATE|INSERT|DELETE|SELECT|SET|WHERE|GROUP|ORDER|HAVING|VALUES)\b'
+    r'|(?P<punct>[,()])'
+)
+
+# 주석 제거 패턴: /* 부터 */ 까지 (Non-greedy)
+COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.DOTALL)
+
+# SELECT 소스 판별 시 테이블 앞쪽으로 역탐색하는 최대 문자 수 (성능 고려)
+SELECT_LOOKBACK = 1000
+
+# 이 개수 이상의 테이블을 한 번에 분류할 때는 NumPy(설치된 경우)로 토큰 위치를 일괄 탐색
+NUMPY_MIN_TABLES = 512
+
+# 문장 분류 결과 캐시 (원문 -> ((table, mask), ...)). 파일 간에 반복되는 문장은 한 번만 분석
+STATEMENT_CACHE_SIZE = 16384
+_statement_cache = {}
+
+_numpy = None
+
+def _load_numpy():
+    """
+    NumPy를 지연 import 합니다. 설치되어 있지 않으면 False를 반환합니다.
+    (import 비용이 크므로 대량 분류 시에만 로드)
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy
+
+def clean_statement(sql_text):
+    """
+    SQL 문을 대문자로 변환하고 /* ... */ 주석(힌트 포함)을 같은 길이의 공백으로 바꿉니다.
     """
     # 대문자로 변환하여 분석
     sql_upper = sql_text.upper()
@@ -93,256 +445,404 @@ def extract_table_crud(sql_text, table_ops, source="UNKNOWN"):
     # 주석 제거 (힌트 처리 및 오탐 방지)
     # /* ... */ 형태의 주석을 공백으로 교체하여 길이(인덱스) 유지
     # 단순화: -- 주석은 행 단위 처리가 필요하므로 여기서는 /* */ 만 처리 (User Case 대응)
-    # 정규식: /* 부터 */ 까지 (Non-greedy)
-    sql_clean = re.sub(r'/\*.*?\*/', lambda m: ' ' * len(m.group()), sql_upper, flags=re.DOTALL)
-    
-    # MERGE 문 특수 처리 (Cleaned SQL 사용)
-    if 'MERGE' in sql_clean:
-        process_merge_statement(sql_clean, table_ops)
-        return
+    return COMMENT_PATTERN.sub(lambda m: ' ' * len(m.group()), sql_upper)
+
+def extract_table_crud(sql_text, table_ops, source="UNKNOWN"):
+    """
+    SQL 텍스트(또는 문자열)에서 TB_, ATA_, EM_ 테이블과 CRUD 키워드를 추출하여 table_ops에 저장합니다.
+    table_ops는 {테이블명(intern): CRUD 비트 마스크} 형태이며 작업은 비트 OR로 누적됩니다.
+    단어 유무만 확인하는 것이 아니라, 문맥(INSERT INTO, UPDATE, FROM 등)을 고려하여
+    정확한 CRUD 작업을 식별합니다.
+    """
+    for table, mask in classify_statements([sql_text])[0]:
+        table_ops[table] |= mask
+
+def classify_statements(statements):
+    """
+    여러 SQL 문을 한 번에 분류합니다.
+
+    반환값: 입력과 같은 순서의 ((table, mask), ...) 튜플 리스트
+    같은 문장은 한 번만 분석하며(이전 호출 결과도 캐시에서 재사용), 새로 분석할 문장들은
+    하나의 텍스트로 이어 붙여 테이블/구조 토큰 위치 배열을 한 번에 만든 뒤 일괄 분류합니다.
+    따라서 처리량은 전체 등장 횟수가 아니라 고유 문장 수에 비례합니다.
+    """
+    results = {}
+    pending = []
+    for sql_text in statements:
+        if sql_text in results:
+            continue
+        cached = _statement_cache.get(sql_text)
+        results[sql_text] = cached
+        if cached is None:
+            pending.append(sql_text)
+
+    if pending:
+        if len(_statement_cache) + len(pending) > STATEMENT_CACHE_SIZE:
+            _statement_cache.clear()
+        for sql_text, result in zip(pending, _classify_unique(pending)):
+            results[sql_text] = result
+            _statement_cache[sql_text] = result
+
+    return [results[sql_text] for sql_text in statements]
+
+def _classify_unique(statements):
+    """
+    중복 없는 SQL 문 목록을 분류합니다. classify_statements()의 본체입니다.
+    """
+    results = [()] * len(statements)
+
+    # 문장 정리 후 MERGE 문은 별도 처리, 나머지는 '\0'으로 이어 붙여 한 번에 스캔
+    parts = []
+    part_index = [] # parts[k] 의 원래 문장 인덱스
+    for idx, sql_text in enumerate(statements):
+        sql_clean = clean_statement(sql_text)
+
+        # MERGE 문 특수 처리 (Cleaned SQL 사용)
+        merge_match = MERGE_STATEMENT_PATTERN.match(sql_clean)
+        if merge_match:
+            merge_ops = defaultdict(int)
+            process_merge_statement(sql_clean[merge_match.start('merge'):], merge_ops)
+            results[idx] = tuple(merge_ops.items())
+            continue
+
+        if PLSQL_BLOCK_PATTERN.match(sql_clean):
+            # PL/SQL 블록: 블록 안의 MERGE 문(다음 ; 까지)은 MERGE 규칙으로, 나머지는 일반 규칙으로 분류
+            merge_ops = defaultdict(int)
+            rest = []
+            pos = 0
+            for match in PLSQL_MERGE_PATTERN.finditer(sql_clean):
+                start = match.start('merge')
+                if start < pos:
+                    continue
+                end = sql_clean.find(';', start)
+                if end == -1:
+                    end = len(sql_clean)
+                process_merge_statement(sql_clean[start:end], merge_ops)
+                rest.append(sql_clean[pos:start])
+                pos = end
+            if pos:
+                rest.append(sql_clean[pos:])
+                sql_clean = ' '.join(rest)
+                results[idx] = tuple(merge_ops.items())
+
+        # '\0'은 문장 구분자로 사용하므로 문장 안의 '\0'은 공백으로 취급
+        parts.append(sql_clean.replace('\0', ' '))
+        part_index.append(idx)
+
+    if not parts:
+        return results
+
+    corpus = '\0'.join(parts)
+    part_starts = []
+    pos = 0
+    for part in parts:
+        part_starts.append(pos)
+        pos += len(part) + 1
 
-    # 테이블 패턴 (스키마 포함)
-    table_pattern = re.compile(r'\b((?:[A-Z0-9_]+\.)?(?:TB_|ATA_|EM_)[A-Z0-9_]+)\b')
-    
     # 모든 테이블 등장 위치 찾기 - Clean된 SQL에서 찾음 (주석 내 테이블 무시 효과)
-    found_tables = []
-    for match in table_pattern.finditer(sql_clean):
-        found_tables.append({
-            'name': match.group(1),
-            'start': match.start(),
-            'end': match.end(),
-            'ops': set()
-        })
-    
-    if not found_tables:
-        return
+    table_names = []
+    table_starts = []
+    table_ends = []
+    for match in TABLE_PATTERN.finditer(corpus):
+        table_names.append(match.group(1))
+        table_starts.append(match.start())
+        table_ends.append(match.end())
 
-    # CRUD 타겟 패턴 정의
-    # INSERT INTO Table
-    insert_pattern = re.compile(r'INSERT\s+INTO\s+((?:[A-Z0-9_]+\.)?(?:TB_|ATA_|EM_)[A-Z0-9_]+)')
-    # INSERT Columns Pattern: INSERT INTO Table (...)
-    # 괄호 안의 내용을 비글리디 하게 잡되, 줄바꿈 포함
-    insert_columns_pattern = re.compile(r'INSERT\s+INTO\s+[A-Z0-9_.]+\s*\((.*?)\)', re.DOTALL)
-    
-    # UPDATE Table
-    update_pattern = re.compile(r'UPDATE\s+((?:[A-Z0-9_]+\.)?(?:TB_|ATA_|EM_)[A-Z0-9_]+)')
-    # DELETE [FROM] Table
-    delete_pattern = re.compile(r'DELETE\s+(?:FROM\s+)?((?:[A-Z0-9_]+\.)?(?:TB_|ATA_|EM_)[A-Z0-9_]+)')
+    if not table_names:
+        return results
 
-    # Column Confusion Check: Remove found_tables that are inside INSERT column list
-    valid_tables = []
-    
-    # 1. Find all exclusion zones (INSERT column lists)
-    exclusion_zones = []
-    for match in insert_columns_pattern.finditer(sql_clean):
+    # Column Confusion Check: INSERT 컬럼 목록 안의 테이블명은 제외
+    # 1. Find all exclusion zones (INSERT column lists) - 겹치지 않고 시작 위치 순으로 정렬됨
+    zone_starts = []
+    zone_ends = []
+    for match in INSERT_COLUMNS_PATTERN.finditer(corpus):
         # group(1) has the content inside parens
-        start_idx = match.start(1)
-        end_idx = match.end(1)
-        exclusion_zones.append((start_idx, end_idx))
-        
-    # 2. Filter found_tables
-    for ft in found_tables:
-        is_column = False
-        for (ex_start, ex_end) in exclusion_zones:
-            # If table is completely inside the exclusion zone
-            if ft['start'] >= ex_start and ft['end'] <= ex_end:
-                is_column = True
-                break
-        
-        if not is_column:
-            valid_tables.append(ft)
-    
-    found_tables = valid_tables
-    if not found_tables:
-        return
+        zone_starts.append(match.start(1))
+        zone_ends.append(match.end(1))
+
+    # 2. 테이블 시작 위치 -> 테이블 인덱스 (CRUD 타겟 매칭용)
+    valid = [True] * len(table_names)
+    by_start = {}
+    for t, start in enumerate(table_starts):
+        z = bisect_right(zone_starts, start) - 1
+        # If table is completely inside the exclusion zone
+        if z >= 0 and table_ends[t] <= zone_ends[z]:
+            valid[t] = False
+        else:
+            by_start[start] = t
 
     # 각 패턴별로 매칭되는 테이블의 위치(span)를 찾아 해당 작업 부여
     # Note: sql_clean을 사용하여 힌트가 공백 처리된 상태이므로 INSERT ... INTO 매칭 성공
-    def mark_operations(pattern, op_name):
-        for match in pattern.finditer(sql_clean):
-            # 매칭된 그룹(테이블명)의 span
-            try:
-                target_start = match.start(1)
-                target_end = match.end(1)
-                
-                # 발견된 테이블 목록에서 이 위치와 일치하는 항목 찾기
-                for ft in found_tables:
-                    # 완벽히 겹치는지 확인 (같은 위치인지)
-                    if ft['start'] == target_start and ft['end'] == target_end:
-                        ft['ops'].add(op_name)
-            except IndexError:
-                pass # 패턴에 그룹이 없는 경우 무시
-
-    mark_operations(insert_pattern, 'INSERT')
-    mark_operations(update_pattern, 'UPDATE')
-    mark_operations(delete_pattern, 'DELETE')
-
-    # 기본적으로 모든 테이블은 SELECT로 간주하되,
-    # 위에서 INSERT/UPDATE/DELETE로 마킹된 적이 없는 경우에만 SELECT를 추가합니다.
-    # 단, INSERT/UPDATE/DELETE 구문의 타겟이 아니면 모두 조회(SELECT) 용도로 봅니다.
-    # 예: INSERT INTO T1 SELECT * FROM T1;
-    # 첫번째 T1: INSERT 마킹됨
-    # 두번째 T1: 마킹 안됨 -> SELECT 추가
-    
+    table_masks = [0] * len(table_names)
+    for pattern, op_name in ((INSERT_PATTERN, 'INSERT'), (UPDATE_PATTERN, 'UPDATE'), (DELETE_PATTERN, 'DELETE')):
+        bit = OP_BITS[op_name]
+        for match in pattern.finditer(corpus):
+            # 매칭된 그룹(테이블명)의 span 과 완벽히 겹치는 테이블 찾기
+            t = by_start.get(match.start(1))
+            if t is not None and table_ends[t] == match.end(1):
+                table_masks[t] |= bit
+
     # [ROBUST SELECT LOGIC]
-    # 단순 Default가 아니라, FROM 또는 JOIN 절에 포함되어 있는지 역방향 탐색으로 확인합니다.
-    # 이를 통해 SELECT 절, WHERE 절, UPDATE SET 절 등에 있는 컬럼명(ATA_ID 등)이 오탐지되는 것을 방지합니다.
-    
-    def is_select_source(table_info):
-        # 테이블 시작 위치에서 역방향으로 스캔하여, 문장의 구조적 위치를 파악
-        start_pos = table_info['start']
-        # 최대 1000자 정도 역탐색 (성능 고려)
-        lookback_limit = max(0, start_pos - 1000)
-        chunk = sql_clean[lookback_limit:start_pos]
-        
-        # 역순으로 하나씩 토큰을 확인
-        # 의미있는 토큰: FROM, JOIN, ',', INSERT, UPDATE, DELETE, SET, WHERE, SELECT, '(', ')'
-        # 콤마(',')는 계속 이전 항목을 찾도록 연결해줌 (FROM T1, T2)
-        # 하지만 SELECT T1, T2 FROM ... 과 구분하기 위해
-        # 콤마를 만나면 계속 뒤로 가되, 궁극적으로 FROM/JOIN을 만나야 함.
-        # SELECT, SET, WHERE 등을 만나면 False.
-        
-        # 정규식으로 토큰화하여 마지막(가장 가까운) 토큰부터 확인
-        # \b 키워드 \b 또는 구두점
-        tokens = list(re.finditer(r'\b(FROM|JOIN|UPDATE|INSERT|DELETE|SELECT|SET|WHERE|GROUP|ORDER|HAVING|VALUES)\b|[,()]', chunk, re.IGNORECASE))
-        
-        if not tokens:
-            return False
-            
-        # 뒤에서부터 순회
-        paren_depth = 0
-        for i in range(len(tokens)-1, -1, -1):
-            tok = tokens[i].group().upper()
-            
-            if tok == ')':
-                paren_depth += 1
-            elif tok == '(':
-                # FROM (Subquery) -> Subquery 닫힘? 아니면 여는 괄호?
-                # 역순이므로 ')' 가 먼저 나오고 '(' 가 나중에 나옴.
-                # 즉 ')' 는 닫는 괄호(원래 문장 순서상), '(' 는 여는 괄호.
-                if paren_depth > 0:
-                    paren_depth -= 1
-                else:
-                    # 괄호 밖으로 나감? 혹은 단순 그룹핑?
-                    # FROM (TB) -> OK.
-                    # IN (COL) -> OK.
-                    # 일단 괄호는 구조적 장벽으로 보고, depth 0일때 괄호에 막히면 중단할 수도 있음.
-                    # 하지만 Table 명이 바로 뒤에 나오는 경우 (FROM T1) 에는 괄호가 없음.
-                    # (T1) -> T1 앞에 (.
-                    pass
-            
-            if paren_depth > 0:
-                continue
+    # CRUD 타겟이 아닌 테이블은 FROM 또는 JOIN 절에 포함되어 있는지 역방향 탐색으로 확인합니다.
+    # 구조 토큰 위치 배열을 한 번 만들어 두고, 테이블마다 바로 앞 토큰 범위를 이진 탐색으로 찾습니다.
+    token_starts = []
+    token_kinds = []
+    for match in CONTEXT_TOKEN_PATTERN.finditer(corpus):
+        token_starts.append(match.start())
+        token_kinds.append(match.group().upper())
 
-            if tok in (',',):
-                continue
-            
-            if tok in ('FROM', 'JOIN'):
-                # DELETE FROM 인지 확인해야 함
-                # FROM 바로 앞 토큰(i-1)이 DELETE인지 확인
-                if i > 0:
-                    prev = tokens[i-1].group().upper()
-                    if prev == 'DELETE':
-                        return False # DELETE target, handled elsewhere
-                return True
-                
-            if tok in ('UPDATE', 'INSERT', 'DELETE', 'SELECT', 'SET', 'WHERE', 'GROUP', 'ORDER', 'HAVING', 'VALUES'):
-                # 다른 절의 시작을 만나면 소스 테이블이 아님
-                return False
-                
-        return False
-
-    for ft in found_tables:
-        # NHPT. 스키마 제거
-        clean_name = ft['name']
-        if clean_name.startswith("NHPT."):
-            clean_name = clean_name.replace("NHPT.", "")
-            
-        if not ft['ops']:
+    # 테이블별 소속 문장 시작 위치 (역탐색이 이전 문장으로 넘어가지 않도록 제한)
+    table_parts = []
+    p = 0
+    for start in table_starts:
+        while p + 1 < len(part_starts) and part_starts[p + 1] <= start:
+            p += 1
+        table_parts.append(p)
+    floors = [max(part_starts[p], start - SELECT_LOOKBACK) for p, start in zip(table_parts, table_starts)]
+
+    # 테이블 t 앞쪽 토큰 범위: token_kinds[lo[t]:hi[t]]
+    np = _load_numpy() if len(table_starts) >= NUMPY_MIN_TABLES else False
+    if np:
+        token_array = np.asarray(token_starts, dtype=np.int64)
+        hi = np.searchsorted(token_array, np.asarray(table_starts, dtype=np.int64)).tolist()
+        lo = np.searchsorted(token_array, np.asarray(floors, dtype=np.int64)).tolist()
+    else:
+        hi = [bisect_left(token_starts, start) for start in table_starts]
+        lo = [bisect_left(token_starts, floor) for floor in floors]
+
+    part_ops = [None] * len(parts)
+    for t, name in enumerate(table_names):
+        if not valid[t]:
+            continue
+
+        mask = table_masks[t]
+        if not mask:
             # 명시적 CRUD 타겟이 아닌 경우
             # SELECT Source 인지 문맥 체크
-            if is_select_source(ft):
-                table_ops[clean_name].add('SELECT')
-            
             # 여기서 매칭되지 않으면 (예: SELECT 절의 컬럼, WHERE 절의 컬럼 등) 아무 작업도 부여되지 않음 -> 무시됨.
-            
-        else:
-            # 이미 CRUD 작업이 식별된 경우
-            for op in ft['ops']:
-                table_ops[clean_name].add(op)
+            if not _is_select_source(token_kinds, lo[t], hi[t]):
+                continue
+            mask = OP_BITS['SELECT']
+
+        ops = part_ops[table_parts[t]]
+        if ops is None:
+            ops = part_ops[table_parts[t]] = defaultdict(int)
+        ops[intern_table(name)] |= mask
+
+    for k, ops in enumerate(part_ops):
+        if ops:
+            # PL/SQL 블록은 블록 안 MERGE 문의 결과와 합침
+            idx = part_index[k]
+            for table, mask in results[idx]:
+                ops[table] |= mask
+            results[idx] = tuple(ops.items())
+
+    return results
+
+def _is_select_source(token_kinds, lo, hi):
+    """
+    테이블 바로 앞의 구조 토큰(token_kinds[lo:hi])을 역순으로 확인하여
+    테이블이 FROM/JOIN 절의 조회 대상인지 판별합니다.
+
+    콤마(',')는 계속 이전 항목을 찾도록 연결해줌 (FROM T1, T2)
+    하지만 SELECT T1, T2 FROM ... 과 구분하기 위해
+    콤마를 만나면 계속 뒤로 가되, 궁극적으로 FROM/JOIN을 만나야 함.
+    SELECT, SET, WHERE 등을 만나면 False.
+    """
+    paren_depth = 0
+    for i in range(hi - 1, lo - 1, -1):
+        tok = token_kinds[i]
+
+        # 역순이므로 ')' 가 먼저 나오고 '(' 가 나중에 나옴.
+        # 즉 ')' 는 닫는 괄호(원래 문장 순서상), '(' 는 여는 괄호.
+        # depth 0 에서 만나는 '(' 는 단순 그룹핑으로 보고 계속 진행 (FROM (TB) / IN (COL))
+        if tok == ')':
+            paren_depth += 1
+        elif tok == '(':
+            if paren_depth > 0:
+                paren_depth -= 1
+
+        if paren_depth > 0:
+            continue
+
+        if tok == ',':
+            continue
+
+        if tok in ('FROM', 'JOIN'):
+            # DELETE FROM 인지 확인해야 함
+            # FROM 바로 앞 토큰(i-1)이 DELETE인지 확인
+            if i > lo and token_kinds[i - 1] == 'DELETE':
+                return False # DELETE target, handled elsewhere
+            return True
+
+        if tok in CLAUSE_STOP_TOKENS:
+            # 다른 절의 시작을 만나면 소스 테이블이 아님
+            return False
+
+    return False
 
 def process_merge_statement(sql_upper, table_ops):
     """
-    MERGE 문을 상세 분석하여 Target 테이블에는 INSERT/UPDATE를,
-    Source 테이블 등에는 SELECT를 부여합니다.
+    MERGE 문을 한 번의 토큰 스캔으로 분석합니다.
+
+    - MERGE INTO [Target] : WHEN ... THEN UPDATE / INSERT / DELETE 절에 따라 UPDATE/INSERT/DELETE
+      (WHEN MATCHED THEN UPDATE SET ... DELETE WHERE ... 의 DELETE 절 포함)
+    - USING [Table] : SELECT
+    - USING (서브쿼리) 및 ON / SET / VALUES 절 등의 나머지 테이블 : 일반 SQL과 같은 규칙으로
+      FROM/JOIN 절의 조회 대상일 때만 SELECT (컬럼명 ATA_ID 등 오탐 방지)
+    Target 테이블도 USING 또는 FROM/JOIN 절에 다시 등장하면 SELECT를 부여합니다.
     """
-    # Target Table 추출: MERGE INTO [Table]
-    # Target Table 추출: MERGE INTO [Table]
-    target_pattern = re.compile(r'MERGE\s+INTO\s+((?:[A-Z0-9_]+\.)?(?:TB_|ATA_|EM_)[A-Z0-9_]+)', re.DOTALL)
-    target_match = target_pattern.search(sql_upper)
-    
     target_table = None
-    if target_match:
-        target_table = target_match.group(1)
-        # NHPT. 스키마 제거
-        if target_table.startswith("NHPT."):
-            target_table = target_table.replace("NHPT.", "")
-        
-        # Target Table Operations
-        # 줄바꿈 등이 섞여 있을 수 있으므로 re.DOTALL 사용
-        # WHEN MATCHED THEN UPDATE
-        if re.search(r'WHEN\s+MATCHED\s+THEN\s+UPDATE', sql_upper, re.DOTALL):
-            table_ops[target_table].add('UPDATE')
-        
-        # WHEN NOT MATCHED THEN INSERT
-        if re.search(r'WHEN\s+NOT\s+MATCHED\s+THEN\s+INSERT', sql_upper, re.DOTALL):
-            table_ops[target_table].add('INSERT')
-            
-    # 나머지 테이블 추출 (Source Tables) -> SELECT 취급
-    # 전체 테이블 찾기 (리스트로 반환하여 개수 확인)
-    all_table_pattern = re.compile(r'\b((?:[A-Z0-9_]+\.)?(?:TB_|ATA_|EM_)[A-Z0-9_]+)\b')
-    all_tables_list = all_table_pattern.findall(sql_upper)
-    all_tables = set(all_tables_list)
-    
-    # Target Table 제외 로직 개선
-    # Target Table이 SQL 문 내에서 여러 번 등장하면 Source(SELECT)로도 사용된 것으로 간주
-    if target_match:
-        raw_target_table = target_match.group(1)
-        
-        # Target Table이 목록에 있고, 등장 횟수가 1번뿐이라면 (Target으로만 사용됨) -> SELECT 목록에서 제외
-        # 만약 2번 이상 등장하면 (Target + Source) -> SELECT 목록에 유지
-        if raw_target_table in all_tables:
-            if all_tables_list.count(raw_target_table) == 1:
-                all_tables.remove(raw_target_table)
-        
-    # 나머지는 모두 SELECT (USING 구문 등)
-    for table in all_tables:
-        # NHPT. 스키마 제거
-        if table.startswith("NHPT."):
-            table = table.replace("NHPT.", "")
-        table_ops[table].add('SELECT')
-
-import argparse
-import glob
-try:
-    from openpyxl import Workbook
-    OPENPYXL_AVAILABLE = True
-except ImportError:
-    OPENPYXL_AVAILABLE = False
+    target_mask = 0
+    source_tables = []
+    other_tables = [] # (테이블명, 시작 위치, 앞쪽 토큰 개수)
+
+    # SELECT 문맥 판별용 구조 토큰 (일반 SQL 분류와 같은 토큰 집합)
+    token_starts = []
+    token_kinds = []
+
+    depth = 0
+    expect = None       # 'TARGET' (MERGE INTO 다음) / 'SOURCE' (USING 다음)
+    when_state = None   # WHEN -> THEN -> 작업 키워드
+    last_action = None
+
+    for match in MERGE_TOKEN_PATTERN.finditer(sql_upper):
+        name = match.group('table')
+        if name:
+            if expect == 'TARGET' and target_table is None:
+                target_table = name
+            elif expect == 'SOURCE':
+                source_tables.append(name)
+            else:
+                other_tables.append((name, match.start(), len(token_kinds)))
+            expect = None
+            continue
+
+        tok = match.group('tok') or match.group('punct')
+        if tok in CONTEXT_TOKENS:
+            token_starts.append(match.start())
+            token_kinds.append(tok)
+
+        if tok == '(':
+            depth += 1
+        elif tok == ')':
+            depth = max(depth - 1, 0)
+
+        if expect and not (expect == 'TARGET' and tok == 'INTO'):
+            expect = None
+
+        # MERGE 구조 키워드는 최상위(괄호 밖)에서만 인식
+        if depth > 0:
+            continue
+
+        if tok == 'MERGE':
+            expect = 'TARGET'
+        elif tok == 'USING':
+            expect = 'SOURCE'
+        elif tok == 'WHEN':
+            when_state = 'WHEN'
+        elif tok == 'THEN' and when_state == 'WHEN':
+            when_state = 'THEN'
+        elif tok in ('UPDATE', 'INSERT', 'DELETE') and when_state == 'THEN':
+            target_mask |= OP_BITS[tok]
+            when_state = None
+            last_action = tok
+        elif tok == 'DELETE' and last_action == 'UPDATE':
+            # WHEN MATCHED THEN UPDATE SET ... DELETE WHERE ...
+            target_mask |= OP_BITS['DELETE']
+
+    if target_table and target_mask:
+        table_ops[intern_table(target_table)] |= target_mask
+
+    for table in source_tables:
+        table_ops[intern_table(table)] |= OP_BITS['SELECT']
+
+    for table, start, hi in other_tables:
+        lo = bisect_left(token_starts, start - SELECT_LOOKBACK)
+        if _is_select_source(token_kinds, lo, hi):
+            table_ops[intern_table(table)] |= OP_BITS['SELECT']
 
 def main():
+    # CLI 전용 모듈은 여기서 import 합니다.
+    # proc_analyzer를 라이브러리로 import 할 때는 argparse/glob/openpyxl 을 로드하지 않습니다.
+    import argparse
+    import glob
+    import io
+
+    # 스냅샷 비교 명령: python proc_analyzer.py diff OLD NEW
+    if len(sys.argv) > 1 and sys.argv[1] == "diff":
+        from snapshot import diff_main
+        diff_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description="Pro*C Source Analyzer")
-    parser.add_argument("-f", "--file", help="Path to a single Pro*C file to analyze")
+    parser.add_argument("-f", "--file", help="Path to a single Pro*C file to analyze ('-' reads from stdin)")
     parser.add_argument("-d", "--folder", help="Directory path to scan for *.pc files")
     parser.add_argument("-e", "--excel", help="Output Excel filename (e.g., result.xlsx)")
     parser.add_argument("-m", "--merge", action="store_true", help="Merge cells for same Source Name and Source Desc. in Excel")
     parser.add_argument("-c", "--encoding", default="euc-kr", help="File encoding (default: euc-kr)")
+    parser.add_argument("-j", "--jsonl", help="Output JSON Lines filename: one record per table/op finding with line and column (e.g., result.jsonl)")
+    parser.add_argument("-s", "--stream", action="store_true", help="Read files in chunks instead of loading them whole (for very large files)")
+    parser.add_argument("--snapshot", help="Save results as a compact snapshot file for later 'diff' (e.g., 2024-02.pcsnap)")
+    parser.add_argument("--base", help="Git base revision: analyze only *.pc files changed between BASE and HEAD and report CRUD deltas")
+    parser.add_argument("--head", default="HEAD", help="Git head revision used with --base (default: HEAD)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-file analysis time budget in seconds; slow files are retried with a safe scanner (default: 30, 0 disables worker processes)")
+    parser.add_argument("--max-size", type=float, default=16.0, help="Files larger than this (MB) skip regex analysis and use the safe scanner (default: 16)")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: CPU count)")
     
     args = parser.parse_args()
-    
-    if args.excel and not OPENPYXL_AVAILABLE:
-        print("Error: 'openpyxl' library is not installed. Please install it using 'pip install openpyxl' or 'uv add openpyxl' to use Excel export.")
-        sys.exit(1)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    # 파일별 시간/크기 예산을 넘긴 항목: (file_path 또는 'path@revision', reason, outcome)
+    guard_issues = []
+    max_size = int(args.max_size * 1024 * 1024)
+
+    def print_guard_report():
+        if guard_issues:
+            print(f"\nGuard Report: {len(guard_issues)} file(s) exceeded budgets (timeout {args.timeout:g}s, max size {args.max_size:g}MB)")
+            print("-" * 60)
+            for issue_path, reason, outcome in guard_issues:
+                print(f"[{reason:<8}] {issue_path} -> {outcome}")
+
+    # Git 변경 파일 분석 모드 (-d 가 있으면 해당 폴더를 git 저장소로 사용)
+    if args.base:
+        from git_delta import analyze_git_changes
+        repo = args.folder or "."
+        try:
+            changes = analyze_git_changes(
+                args.base, args.head, repo=repo, encoding=args.encoding,
+                timeout=args.timeout, max_size=max_size, workers=args.workers, issues=guard_issues
+            )
+        except RuntimeError as e:
+            print(f"Error: git - {e}")
+            sys.exit(1)
+
+        print(f"\nCRUD Delta: {args.base}..{args.head} ({len(changes)} changed *.pc files)")
+        print("-" * 60)
+        for path, status, added, removed in changes:
+            print(f"[{status}] {path}")
+            for issue_path, reason, outcome in guard_issues:
+                if issue_path.startswith(path + "@"):
+                    print(f"    Guard: {issue_path.rsplit('@', 1)[1]} {reason} -> {outcome}")
+            if not added and not removed:
+                print("    (no CRUD changes)")
+            for table, op in added:
+                print(f"  + {table:<30} | {op}")
+            for table, op in removed:
+                print(f"  - {table:<30} | {op}")
+        print("\n" + "="*60)
+        print_guard_report()
+        return
+
+    # openpyxl은 엑셀 출력이 요청된 경우에만 로드 (import 비용이 큼)
+    export_excel = None
+    if args.excel:
+        try:
+            from excel_export import export_excel
+        except ImportError:
+            print("Error: 'openpyxl' library is not installed. Please install it using 'pip install openpyxl' or 'uv add openpyxl' to use Excel export.")
+            sys.exit(1)
 
     files_to_process = []
     
@@ -362,95 +862,108 @@ def main():
         parser.print_help()
         sys.exit(1)
 
+    # JSONL은 파일 단위로 바로 기록 (전체 결과를 메모리에 모으지 않음)
+    jsonl_file = None
+    if args.jsonl:
+        import json
+        try:
+            jsonl_file = open(args.jsonl, 'w', encoding='utf-8')
+        except OSError as e:
+            print(f"Error: Cannot open JSONL file - {e}")
+            sys.exit(1)
+
     # Collect all results
-    all_results = [] # List of tuples: (filename, source_desc, table, operations)
+    all_results = [] # List of tuples: (filename, source_desc, table, operations, line, column)
+    snapshot_results = [] # List of tuples: (file_key, source_desc, table_ops)
 
-    for file_path in files_to_process:
-        result, source_desc = analyze_file(file_path, encoding=args.encoding)
-        file_name = os.path.basename(file_path)
+    # 구문별 전체 위치 목록은 JSONL 출력에만 필요. 그 외에는 테이블별 첫 위치만 기록
+    location_type = dict if args.jsonl else FirstLocations
+
+    def analyze_inline():
+        for file_path in files_to_process:
+            locations = location_type()
+            if file_path == "-":
+                # 표준입력은 항상 스트리밍 모드로 분석 (예: git show HEAD:foo.pc | python proc_analyzer.py -f -)
+                stdin = io.TextIOWrapper(sys.stdin.buffer, encoding=args.encoding, errors='ignore')
+                result, source_desc = analyze_stream(stdin, locations=locations)
+            else:
+                result, source_desc = analyze_file(file_path, encoding=args.encoding, stream=args.stream, locations=locations)
+            yield file_path, result, source_desc, locations
+
+    # 파일별 시간/크기 예산: 워커 프로세스에서 분석하고, 예산을 넘긴 파일은 안전 스캐너로 재분석
+    if args.timeout > 0 and args.file != "-":
+        from analyze_guard import analyze_files_guarded
+        analyzed = analyze_files_guarded(
+            files_to_process, encoding=args.encoding, stream=args.stream, locations=location_type,
+            timeout=args.timeout, max_size=max_size, workers=args.workers, issues=guard_issues
+        )
+    else:
+        analyzed = analyze_inline()
+
+    for file_path, result, source_desc, locations in analyzed:
+        file_name = "<stdin>" if file_path == "-" else os.path.basename(file_path)
+        first_locs = first_locations(locations)
+
+        if jsonl_file:
+            findings = sorted((loc, table, op) for (table, op), locs in locations.items() for loc in locs)
+            for (line, column), table, op in findings:
+                jsonl_file.write(json.dumps({
+                    "file": file_path, "table": table, "op": op, "line": line, "column": column
+                }, ensure_ascii=False) + "\n")
+
+        if args.snapshot:
+            # 폴더 분석 시에는 폴더 기준 상대 경로를 키로 사용 (하위 폴더의 같은 파일명 구분)
+            if args.folder and file_path != "-":
+                file_key = os.path.relpath(file_path, args.folder).replace(os.sep, "/")
+            else:
+                file_key = file_name
+            snapshot_results.append((file_key, source_desc, result))
 
         # Console Output
         print(f"\nAnalysis Report for: {file_path}")
         print(f"Source Desc: {source_desc}")
-        print(f"{'Table Name':<30} | {'CRUD Operations'}")
-        print("-" * 60)
+        for issue_path, reason, outcome in guard_issues:
+            if issue_path == file_path:
+                print(f"Guard: {reason} -> {outcome}")
+        print(f"{'Table Name':<30} | {'CRUD Operations':<30} | {'Line:Col'}")
+        print("-" * 75)
         
         if not result:
             print("No tables found or file error.")
         else:
             sorted_tables = sorted(result.keys())
             for table in sorted_tables:
-                ops = ", ".join(sorted(result[table]))
-                print(f"{table:<30} | {ops}")
+                ops = MASK_LABELS[result[table]]
+                # 테이블이 처음 등장한 구문의 위치
+                line, column = first_locs.get(table, (None, None))
+                print(f"{table:<30} | {ops:<30} | {line}:{column}")
                 # Add to results for Excel
-                all_results.append((file_name, source_desc, table, ops))
-        print("\n" + "="*60)
+                all_results.append((file_name, source_desc, table, ops, line, column))
+        print("\n" + "="*75)
+
+    print_guard_report()
+
+    if jsonl_file:
+        jsonl_file.close()
+        print(f"\nJSONL file saved successfully to: {args.jsonl}")
 
     # Excel Export
     if args.excel:
         try:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Analysis Result"
-            
-            # Header
-            from openpyxl.styles import Alignment
-            ws.append(["Source Name", "Source Desc.", "Table Name", "CRUD Operations"])
-            
-            # Data
-            # Sort mainly for merging logic (though processing order might be enough, safety first)
-            # But here we process file by file, so it's naturally sorted by file processing order.
-            
-            start_row = 2 # Data starts from row 2
-            for row in all_results:
-                ws.append(row)
-            
-            last_row = ws.max_row
-
-            # Merging Logic
-            if args.merge and last_row >= start_row:
-                # Iterate to find ranges to merge
-                # We need to merge Column 1 (Source Name) and Column 2 (Source Desc.)
-                
-                # Helper to merge a specific column
-                def merge_column(col_idx):
-                    current_val = ws.cell(row=start_row, column=col_idx).value
-                    merge_start = start_row
-                    
-                    for r in range(start_row + 1, last_row + 2): # Go one past end to handle last block
-                        val = ws.cell(row=r, column=col_idx).value if r <= last_row else None
-                        
-                        if val != current_val:
-                            # End of a block
-                            if r - 1 > merge_start:
-                                ws.merge_cells(start_row=merge_start, start_column=col_idx, end_row=r-1, end_column=col_idx)
-                                # Center alignment for merged cells
-                                cell = ws.cell(row=merge_start, column=col_idx)
-                                cell.alignment = Alignment(vertical='center', horizontal='center')
-                            
-                            current_val = val
-                            merge_start = r
-
-                merge_column(1) # Source Name
-                merge_column(2) # Source Desc.
-
-            # Auto-adjust column width (simple approximation)
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column_letter # Get the column name
-                for cell in col:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(cell.value)
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                ws.column_dimensions[column].width = adjusted_width
-
-            wb.save(args.excel)
+            export_excel(all_results, args.excel, merge=args.merge)
             print(f"\nExcel file saved successfully to: {args.excel}")
         except Exception as e:
             print(f"\nError saving Excel file: {e}")
 
+    # Snapshot Export
+    if args.snapshot:
+        from snapshot import build_snapshot, save_snapshot
+        try:
+            snapshot = build_snapshot(snapshot_results)
+            save_snapshot(snapshot, args.snapshot)
+            print(f"\nSnapshot saved successfully to: {args.snapshot} ({len(snapshot)} rows)")
+        except Exception as e:
+            print(f"\nError saving snapshot: {e}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,248 @@
+"""
+분석 결과를 압축된 컬럼 형식의 스냅샷 파일로 저장/로드하고, 두 스냅샷을 비교하는 모듈입니다.
+
+스냅샷 구조 (MAGIC 뒤의 본문은 zlib 압축):
+- 문자열 테이블: 파일명 / 설명(파일별) / 테이블명 (각각 정렬·중복 제거된 목록, '\\0' 구분)
+- 컬럼: 파일별 행 시작 오프셋, 행별 테이블 인덱스, 행별 CRUD 비트 마스크, 파일별 다이제스트
+
+파일명과 테이블명 목록이 정렬되어 있고 행도 (파일, 테이블) 순으로 저장되므로,
+두 스냅샷은 정렬 병합(sorted-merge)으로 비교할 수 있습니다.
+파일별 다이제스트가 같으면 해당 파일의 행은 비교하지 않으므로, 비교 비용은
+파일 수 + 변경된 파일의 행 수에 비례합니다. openpyxl 없이 동작합니다.
+"""
+import hashlib
+import struct
+import sys
+import zlib
+from array import array
+
+from proc_analyzer import MASK_LABELS
+
+MAGIC = b"PCSNAP\x00\x01"
+HEADER = struct.Struct("<III")  # n_files, n_tables, n_rows
+LENGTH = struct.Struct("<I")
+
+
+class Snapshot:
+    """
+    로드된 스냅샷. 행 i 는 row_tables[i] (tables 인덱스), row_masks[i] (CRUD 마스크)이며,
+    파일 f 의 행 범위는 file_offsets[f] ~ file_offsets[f + 1] 입니다.
+    """
+
+    def __init__(self, files, descs, tables, file_offsets, row_tables, row_masks, digests):
+        self.files = files
+        self.descs = descs
+        self.tables = tables
+        self.file_offsets = file_offsets
+        self.row_tables = row_tables
+        self.row_masks = row_masks
+        self.digests = digests
+
+    def __len__(self):
+        return len(self.row_tables)
+
+    def file_rows(self, f):
+        """
+        파일 f 의 (테이블명, 마스크) 목록을 테이블명 순으로 반환합니다.
+        """
+        start, end = self.file_offsets[f], self.file_offsets[f + 1]
+        tables = self.tables
+        return [(tables[self.row_tables[r]], self.row_masks[r]) for r in range(start, end)]
+
+
+def _file_digest(rows):
+    """
+    (테이블명, 마스크) 목록의 64비트 다이제스트. 파일 단위 변경 여부 판단에 사용합니다.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    for table, mask in rows:
+        h.update(table.encode('utf-8'))
+        h.update(bytes((0, mask)))
+    return int.from_bytes(h.digest(), 'little')
+
+
+def build_snapshot(file_results):
+    """
+    분석 결과로 Snapshot을 만듭니다.
+
+    file_results: (file_key, source_desc, table_ops) 의 iterable
+    table_ops: {table: CRUD 비트 마스크}
+    같은 file_key가 여러 번 나오면 테이블별 작업을 합칩니다.
+    """
+    merged = {}
+    for file_key, source_desc, table_ops in file_results:
+        desc, masks = merged.setdefault(file_key, (source_desc, {}))
+        for table, mask in table_ops.items():
+            if mask:
+                masks[table] = masks.get(table, 0) | mask
+
+    files = sorted(merged)
+    tables = sorted({table for _, masks in merged.values() for table in masks})
+    table_ids = {table: i for i, table in enumerate(tables)}
+
+    descs = []
+    file_offsets = array('I', [0])
+    row_tables = array('I')
+    row_masks = array('B')
+    digests = array('Q')
+
+    for file_key in files:
+        desc, masks = merged[file_key]
+        rows = sorted(masks.items())
+        descs.append((desc or "").replace("\0", " "))
+        for table, mask in rows:
+            row_tables.append(table_ids[table])
+            row_masks.append(mask)
+        file_offsets.append(len(row_tables))
+        digests.append(_file_digest(rows))
+
+    return Snapshot(files, descs, tables, file_offsets, row_tables, row_masks, digests)
+
+
+def _pack_strings(strings):
+    data = "\0".join(strings).encode('utf-8')
+    return LENGTH.pack(len(data)) + data
+
+
+def _unpack_strings(body, pos, count):
+    (size,) = LENGTH.unpack_from(body, pos)
+    pos += LENGTH.size
+    strings = body[pos:pos + size].decode('utf-8').split("\0") if count else []
+    return strings, pos + size
+
+
+def _pack_array(arr):
+    if sys.byteorder != 'little':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _unpack_array(typecode, body, pos, count):
+    arr = array(typecode)
+    end = pos + arr.itemsize * count
+    arr.frombytes(body[pos:end])
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr, end
+
+
+def save_snapshot(snapshot, path):
+    """
+    Snapshot을 파일로 저장합니다.
+    """
+    body = b"".join([
+        HEADER.pack(len(snapshot.files), len(snapshot.tables), len(snapshot)),
+        _pack_strings(snapshot.files),
+        _pack_strings(snapshot.descs),
+        _pack_strings(snapshot.tables),
+        _pack_array(snapshot.file_offsets),
+        _pack_array(snapshot.row_tables),
+        _pack_array(snapshot.row_masks),
+        _pack_array(snapshot.digests),
+    ])
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(zlib.compress(body, 6))
+
+
+def load_snapshot(path):
+    """
+    스냅샷 파일을 읽어 Snapshot을 반환합니다. 형식이 다르면 ValueError를 발생시킵니다.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a snapshot file: {path}")
+        body = zlib.decompress(f.read())
+
+    n_files, n_tables, n_rows = HEADER.unpack_from(body, 0)
+    pos = HEADER.size
+    files, pos = _unpack_strings(body, pos, n_files)
+    descs, pos = _unpack_strings(body, pos, n_files)
+    tables, pos = _unpack_strings(body, pos, n_tables)
+    file_offsets, pos = _unpack_array('I', body, pos, n_files + 1)
+    row_tables, pos = _unpack_array('I', body, pos, n_rows)
+    row_masks, pos = _unpack_array('B', body, pos, n_rows)
+    digests, pos = _unpack_array('Q', body, pos, n_files)
+
+    return Snapshot(files, descs, tables, file_offsets, row_tables, row_masks, digests)
+
+
+def diff_snapshots(old, new):
+    """
+    두 Snapshot을 정렬 병합으로 비교합니다.
+
+    반환값: (added, removed, changed)
+    - added / removed: (file, table, mask) 리스트
+    - changed: (file, table, old_mask, new_mask) 리스트
+    """
+    added, removed, changed = [], [], []
+    i = j = 0
+    n_old, n_new = len(old.files), len(new.files)
+
+    while i < n_old or j < n_new:
+        old_file = old.files[i] if i < n_old else None
+        new_file = new.files[j] if j < n_new else None
+
+        if new_file is None or (old_file is not None and old_file < new_file):
+            removed.extend((old_file, table, mask) for table, mask in old.file_rows(i))
+            i += 1
+        elif old_file is None or new_file < old_file:
+            added.extend((new_file, table, mask) for table, mask in new.file_rows(j))
+            j += 1
+        else:
+            # 같은 파일: 다이제스트가 다를 때만 행 단위로 병합 비교
+            if old.digests[i] != new.digests[j]:
+                _diff_file_rows(old_file, old.file_rows(i), new.file_rows(j), added, removed, changed)
+            i += 1
+            j += 1
+
+    return added, removed, changed
+
+
+def _diff_file_rows(file_key, old_rows, new_rows, added, removed, changed):
+    a = b = 0
+    while a < len(old_rows) or b < len(new_rows):
+        if b >= len(new_rows) or (a < len(old_rows) and old_rows[a][0] < new_rows[b][0]):
+            removed.append((file_key, old_rows[a][0], old_rows[a][1]))
+            a += 1
+        elif a >= len(old_rows) or new_rows[b][0] < old_rows[a][0]:
+            added.append((file_key, new_rows[b][0], new_rows[b][1]))
+            b += 1
+        else:
+            if old_rows[a][1] != new_rows[b][1]:
+                changed.append((file_key, old_rows[a][0], old_rows[a][1], new_rows[b][1]))
+            a += 1
+            b += 1
+
+
+def diff_main(argv):
+    """
+    'proc_analyzer.py diff OLD NEW' 명령 처리.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="proc_analyzer.py diff", description="Compare two analysis snapshots")
+    parser.add_argument("old", help="Old snapshot file (e.g., 2024-01.pcsnap)")
+    parser.add_argument("new", help="New snapshot file (e.g., 2024-02.pcsnap)")
+    args = parser.parse_args(argv)
+
+    try:
+        old = load_snapshot(args.old)
+        new = load_snapshot(args.new)
+    except (OSError, ValueError, zlib.error) as e:
+        print(f"Error reading snapshot: {e}")
+        sys.exit(1)
+
+    added, removed, changed = diff_snapshots(old, new)
+
+    print(f"\nSnapshot Diff: {args.old} ({len(old)} rows) -> {args.new} ({len(new)} rows)")
+    print(f"Added: {len(added)}, Removed: {len(removed)}, Changed: {len(changed)}")
+    print("-" * 60)
+    for file_key, table, mask in added:
+        print(f"  + {file_key} | {table:<30} | {MASK_LABELS[mask]}")
+    for file_key, table, mask in removed:
+        print(f"  - {file_key} | {table:<30} | {MASK_LABELS[mask]}")
+    for file_key, table, old_mask, new_mask in changed:
+        print(f"  ~ {file_key} | {table:<30} | {MASK_LABELS[old_mask]} -> {MASK_LABELS[new_mask]}")
+    print("\n" + "="*60)
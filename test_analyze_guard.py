@@ -0,0 +1,125 @@
+"""
+파일별 시간/크기 예산(analyze_guard) 회귀 테스트.
+
+- 시간 예산을 넘긴 파일은 워커를 종료하고 안전 스캐너로 다시 분석하며, 결과는 입력 순서대로 나와야 합니다.
+- 크기 예산을 넘은 파일은 바로 안전 스캐너로 분석하되, 스트리밍 모드에서는 크기 예산을 적용하지 않습니다.
+- 안전 스캐너는 청크 크기와 관계없이 같은 결과를 내야 합니다.
+
+실행: python -m pytest -q test_analyze_guard.py
+"""
+import io
+
+import pytest
+
+import analyze_guard
+from analyze_guard import (
+    analyze_content_safe, analyze_contents_guarded, analyze_files_guarded, analyze_stream_safe
+)
+from proc_analyzer import OP_BITS, analyze_content
+
+S, I, U = OP_BITS['SELECT'], OP_BITS['INSERT'], OP_BITS['UPDATE']
+
+NORMAL_A = "EXEC SQL SELECT A INTO :a FROM TB_A;\n"
+NORMAL_B = 'strcpy(sql, "UPDATE TB_B SET A = 1");\n'
+# ; 가 없는 EXEC SQL 블록이 반복되어 정규식 분석이 사실상 끝나지 않는 파일
+HANGING = (
+    'strcpy(sql, "INSERT INTO TB_SAFE (A) VALUES (1)");\n'
+    + "EXEC SQL SELECT A FROM TB_X WHERE B = :b\n" * 20000
+)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = []
+    for name, content in (("a.pc", NORMAL_A), ("hanging.pc", HANGING), ("b.pc", NORMAL_B)):
+        path = tmp_path / name
+        path.write_text(content, encoding='euc-kr')
+        paths.append(str(path))
+    return paths
+
+
+def test_timeout_retries_with_safe_scanner_in_order(sources):
+    issues = []
+    results = list(analyze_files_guarded(sources, locations=dict, timeout=1.0, workers=2, issues=issues))
+
+    assert [path for path, _, _, _ in results] == sources
+    assert [dict(table_ops) for _, table_ops, _, _ in results] == [
+        {'TB_A': S}, {'TB_SAFE': I}, {'TB_B': U}
+    ]
+    assert results[1][3] == {('TB_SAFE', 'INSERT'): [(1, 13)]}
+    assert issues == [(sources[1], "timeout", "safe scanner")]
+
+
+def test_oversize_goes_to_safe_scanner(sources):
+    issues = []
+    results = list(analyze_files_guarded(sources, max_size=1024, workers=1, issues=issues))
+
+    assert [dict(table_ops) for _, table_ops, _, _ in results] == [
+        {'TB_A': S}, {'TB_SAFE': I}, {'TB_B': U}
+    ]
+    assert issues == [(sources[1], "oversize", "safe scanner")]
+
+
+def test_stream_mode_ignores_size_budget(tmp_path):
+    path = tmp_path / "big.pc"
+    path.write_text(NORMAL_A * 100, encoding='euc-kr')
+    issues = []
+    results = list(analyze_files_guarded([str(path)], stream=True, max_size=1024, issues=issues))
+
+    assert issues == []
+    assert dict(results[0][1]) == {'TB_A': S}
+
+
+def test_contents_guarded_uses_labels():
+    issues = []
+    items = [("a.pc@HEAD", NORMAL_A), ("hanging.pc@HEAD", HANGING), ("b.pc@HEAD", NORMAL_B)]
+    results = list(analyze_contents_guarded(items, timeout=1.0, issues=issues))
+
+    assert [label for label, _, _, _ in results] == [label for label, _ in items]
+    assert dict(results[1][1]) == {'TB_SAFE': I}
+    assert issues == [("hanging.pc@HEAD", "timeout", "safe scanner")]
+
+
+SAFE_SOURCE = (
+    "/*\n * 프로그램명 : 안전 스캐너\n */\n"
+    "EXEC SQL SELECT A INTO :a FROM TB_A;\n"
+    "EXEC SQL SELECT A FROM TB_NO_SEMICOLON WHERE B = :b\n"
+    'strcpy(sql, "SELECT A "\n'
+    '            "  FROM TB_CHAIN");\n'
+    'strcpy(sql, "UPDATE TB_LONG SET A = 1 "  "WHERE B = 2 AND C = 3 AND D = 4");\n'
+    'strcpy(sql, "DELETE FROM TB_OPEN\n'
+    'EXEC SQL UPDATE TB_B SET A = 1;\n'
+)
+
+
+@pytest.mark.parametrize('chunk_size', (1, 2, 3, 7, 64))
+@pytest.mark.parametrize('max_statement', (48, 64 * 1024))
+def test_safe_scanner_chunk_independent(monkeypatch, chunk_size, max_statement):
+    monkeypatch.setattr(analyze_guard, 'SAFE_MAX_STATEMENT', max_statement)
+    expected_locations = {}
+    expected = analyze_content_safe(SAFE_SOURCE, locations=expected_locations)
+
+    locations = {}
+    result = analyze_stream_safe(io.StringIO(SAFE_SOURCE), chunk_size=chunk_size, locations=locations)
+    assert (dict(result[0]), result[1]) == (dict(expected[0]), expected[1])
+    assert {key: sorted(locs) for key, locs in locations.items()} == \
+        {key: sorted(locs) for key, locs in expected_locations.items()}
+
+    if max_statement == 48:
+        # 상한 안에 ; 가 없는 EXEC SQL 블록(TB_NO_SEMICOLON)과 상한을 넘는 연결 문자열(TB_LONG)은 건너뜀
+        assert dict(result[0]) == {'TB_A': S, 'TB_B': U, 'TB_CHAIN': S}
+    else:
+        # ; 가 빠진 블록은 다음 ; 까지를 한 구문으로 봄
+        assert dict(result[0]) == {'TB_A': S, 'TB_B': U, 'TB_CHAIN': S, 'TB_LONG': U, 'TB_NO_SEMICOLON': S}
+    assert result[1] == "안전 스캐너"
+
+
+def test_safe_scanner_skips_char_literal_quote():
+    # 정규식 분석은 '"' 의 따옴표부터 문자열로 읽어 뒤의 동적 SQL 을 놓침 (README 10절)
+    src = (
+        "char q = '\"';\n"
+        'sprintf(sql, "SELECT A FROM TB_I");\n'
+        "EXEC SQL SELECT B INTO :b FROM TB_S;\n"
+    )
+    assert dict(analyze_content(src)[0]) == {'TB_S': S}
+    assert dict(analyze_content_safe(src)[0]) == {'TB_S': S, 'TB_I': S}
@@ -0,0 +1,76 @@
+"""
+MERGE 문 판별 회귀 테스트.
+
+EXEC SQL AT <db> / FOR <호스트 변수> 절이나 -- 줄 주석이 MERGE 앞에 있어도
+MERGE 문으로 분석되어야 하고, 이름에 MERGE 가 들어간 테이블/컬럼은 MERGE 문으로 보지 않아야 합니다.
+
+실행: python -m pytest -q test_merge_statement.py
+"""
+from proc_analyzer import OP_BITS, classify_statements, EXEC_SQL_PATTERN
+
+SELECT = OP_BITS['SELECT']
+INSERT = OP_BITS['INSERT']
+UPDATE = OP_BITS['UPDATE']
+
+MERGE_BODY = (
+    "MERGE INTO TB_M T USING TB_S S ON (T.ID = S.ID) "
+    "WHEN MATCHED THEN UPDATE SET T.A = S.A"
+)
+MERGE_EXPECTED = {'TB_M': UPDATE, 'TB_S': SELECT}
+
+
+def classify(sql_text):
+    return dict(classify_statements([sql_text])[0])
+
+
+def test_merge_plain():
+    assert classify(MERGE_BODY) == MERGE_EXPECTED
+
+
+def test_merge_after_at_clause():
+    assert classify("AT :db " + MERGE_BODY) == MERGE_EXPECTED
+    assert classify("at DB_LINK\n  " + MERGE_BODY) == MERGE_EXPECTED
+
+
+def test_merge_after_for_clause():
+    assert classify("FOR :n " + MERGE_BODY) == MERGE_EXPECTED
+    assert classify("AT :db FOR :n_rows " + MERGE_BODY) == MERGE_EXPECTED
+
+
+def test_merge_after_line_comments():
+    assert classify("-- upsert\n " + MERGE_BODY) == MERGE_EXPECTED
+    assert classify("-- a\n  -- b\nFOR :n " + MERGE_BODY) == MERGE_EXPECTED
+    # 주석 안의 테이블명은 분석하지 않음
+    assert classify("-- copy from TB_X\n" + MERGE_BODY) == MERGE_EXPECTED
+
+
+def test_merge_in_exec_sql_block():
+    content = "EXEC SQL FOR :n\n  " + MERGE_BODY + "\n  WHEN NOT MATCHED THEN INSERT (ID) VALUES (S.ID);"
+    statements = [m.group(1) for m in EXEC_SQL_PATTERN.finditer(content)]
+    assert classify(statements[0]) == {'TB_M': UPDATE | INSERT, 'TB_S': SELECT}
+
+
+def test_merge_in_names_is_not_merge_statement():
+    assert classify("INSERT INTO TB_EMERGE_LOG (A) VALUES (1)") == {'TB_EMERGE_LOG': INSERT}
+    assert classify("SELECT MERGE_YN FROM TB_Z") == {'TB_Z': SELECT}
+    assert classify("UPDATE TB_Z SET MERGE_YN = 'Y'") == {'TB_Z': UPDATE}
+    assert classify("AT :db SELECT MERGE_YN FROM TB_Z") == {'TB_Z': SELECT}
+
+
+def test_merge_in_plsql_block():
+    assert classify("EXECUTE BEGIN " + MERGE_BODY) == MERGE_EXPECTED
+    assert classify("DECLARE BEGIN " + MERGE_BODY) == MERGE_EXPECTED
+    assert classify("DECLARE V NUMBER; BEGIN " + MERGE_BODY + "; END;") == MERGE_EXPECTED
+    assert classify("BEGIN IF :X = 1 THEN " + MERGE_BODY + "; END IF; END;") == MERGE_EXPECTED
+    assert classify("BEGIN -- upsert\n " + MERGE_BODY + "; END;") == MERGE_EXPECTED
+
+
+def test_merge_after_semicolon_in_plsql_block():
+    # 블록 안의 다른 DML 은 일반 규칙으로 분류
+    sql = "BEGIN UPDATE TB_A SET X = 1; " + MERGE_BODY + "; DELETE FROM TB_D; END;"
+    assert classify(sql) == dict(MERGE_EXPECTED, TB_A=UPDATE, TB_D=OP_BITS['DELETE'])
+
+
+def test_plsql_block_without_merge():
+    assert classify("BEGIN UPDATE TB_A SET X = 1; END;") == {'TB_A': UPDATE}
+    assert classify("BEGIN SELECT MERGE_YN INTO :v FROM TB_Z; END;") == {'TB_Z': SELECT}
@@ -0,0 +1,99 @@
+"""
+스냅샷 저장/로드와 비교 회귀 테스트.
+
+save_snapshot() 으로 저장한 파일을 load_snapshot() 으로 읽으면 모든 컬럼이 그대로 복원되어야 하고,
+diff_snapshots() 는 파일/테이블 단위의 추가, 삭제, 변경을 정확히 찾아야 합니다.
+
+실행: python -m pytest -q test_snapshot.py
+"""
+import pytest
+
+from proc_analyzer import OP_BITS
+from snapshot import MAGIC, build_snapshot, diff_snapshots, load_snapshot, save_snapshot
+
+S, I, U, D = (OP_BITS[op] for op in ('SELECT', 'INSERT', 'UPDATE', 'DELETE'))
+
+OLD_RESULTS = [
+    ("src/order.pc", "주문 처리", {'TB_ORDER': S | U, 'TB_ITEM': S}),
+    ("src/batch.pc", "정산 배치", {'TB_CALC': I | D, 'TB_ORDER': S}),
+    ("src/legacy.pc", "", {'TB_OLD': S}),
+    ("src/empty.pc", "", {}),
+]
+
+NEW_RESULTS = [
+    # TB_ITEM 삭제, TB_ORDER 변경 (UPDATE 제거), TB_STOCK 추가
+    ("src/order.pc", "주문 처리", {'TB_ORDER': S, 'TB_STOCK': U}),
+    # 변경 없음 (다이제스트가 같아 행 비교를 건너뜀)
+    ("src/batch.pc", "정산 배치", {'TB_CALC': I | D, 'TB_ORDER': S}),
+    # legacy.pc 파일 삭제, new.pc 파일 추가
+    ("src/new.pc", "신규\0기능", {'TB_NEW': I, 'TB_ORDER': S}),
+    ("src/empty.pc", "", {}),
+]
+
+
+def assert_same_snapshot(loaded, snap):
+    assert loaded.files == snap.files
+    assert loaded.descs == snap.descs
+    assert loaded.tables == snap.tables
+    assert list(loaded.file_offsets) == list(snap.file_offsets)
+    assert list(loaded.row_tables) == list(snap.row_tables)
+    assert list(loaded.row_masks) == list(snap.row_masks)
+    assert list(loaded.digests) == list(snap.digests)
+
+
+def test_build_snapshot():
+    snap = build_snapshot(OLD_RESULTS + [("src/order.pc", "", {'TB_ORDER': I, 'TB_ZERO': 0})])
+    assert snap.files == sorted(file_key for file_key, _, _ in OLD_RESULTS)
+    assert snap.tables == ['TB_CALC', 'TB_ITEM', 'TB_OLD', 'TB_ORDER']
+    # 같은 파일은 합치고, 마스크가 0인 테이블은 행을 만들지 않음
+    order = snap.files.index("src/order.pc")
+    assert snap.file_rows(order) == [('TB_ITEM', S), ('TB_ORDER', S | I | U)]
+    assert snap.file_rows(snap.files.index("src/empty.pc")) == []
+    assert len(snap) == 5
+    # 설명의 '\0' 은 문자열 테이블 구분자이므로 공백으로 바뀜
+    new = build_snapshot(NEW_RESULTS)
+    assert new.descs[new.files.index("src/new.pc")] == "신규 기능"
+
+
+@pytest.mark.parametrize('results', [OLD_RESULTS, NEW_RESULTS, []], ids=['old', 'new', 'empty'])
+def test_save_load_round_trip(tmp_path, results):
+    snap = build_snapshot(results)
+    path = tmp_path / "result.pcsnap"
+    save_snapshot(snap, path)
+
+    assert path.read_bytes().startswith(MAGIC)
+    loaded = load_snapshot(path)
+    assert_same_snapshot(loaded, snap)
+    assert [loaded.file_rows(f) for f in range(len(loaded.files))] == \
+        [snap.file_rows(f) for f in range(len(snap.files))]
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "not_snapshot.pcsnap"
+    path.write_bytes(b"PK\x03\x04 not a snapshot")
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+
+def test_diff_snapshots(tmp_path):
+    save_snapshot(build_snapshot(OLD_RESULTS), tmp_path / "old.pcsnap")
+    save_snapshot(build_snapshot(NEW_RESULTS), tmp_path / "new.pcsnap")
+    old = load_snapshot(tmp_path / "old.pcsnap")
+    new = load_snapshot(tmp_path / "new.pcsnap")
+
+    added, removed, changed = diff_snapshots(old, new)
+    assert sorted(added) == [
+        ("src/new.pc", 'TB_NEW', I),
+        ("src/new.pc", 'TB_ORDER', S),
+        ("src/order.pc", 'TB_STOCK', U),
+    ]
+    assert sorted(removed) == [
+        ("src/legacy.pc", 'TB_OLD', S),
+        ("src/order.pc", 'TB_ITEM', S),
+    ]
+    assert changed == [("src/order.pc", 'TB_ORDER', S | U, S)]
+
+
+def test_diff_identical_snapshots():
+    snap = build_snapshot(OLD_RESULTS)
+    assert diff_snapshots(snap, build_snapshot(reversed(OLD_RESULTS))) == ([], [], [])
@@ -0,0 +1,97 @@
+"""
+스트리밍 분석 회귀 테스트.
+
+analyze_stream()은 청크 크기와 관계없이 analyze_content()와 같은 결과(테이블별 CRUD, 설명, 위치)를
+내야 합니다. 작은 청크 크기로 EXEC SQL 블록, 연결 문자열, 설명 라인이 청크 경계에 걸치게 합니다.
+
+실행: python -m pytest -q test_stream_analysis.py
+"""
+import io
+
+import pytest
+
+from proc_analyzer import analyze_content, analyze_stream
+
+CHUNK_SIZES = (1, 2, 3, 5, 7, 64)
+
+SOURCES = {
+    # ; 가 여러 청크 뒤에 오는 EXEC SQL 블록 (대소문자, 줄바꿈 섞임)
+    'pending_exec_sql': (
+        "int main() {\n"
+        "    EXEC SQL SELECT A, B\n"
+        "               INTO :a, :b\n"
+        "               FROM TB_USER U, TB_DEPT D\n"
+        "              WHERE U.ID = D.ID;\n"
+        "    exec  sql\n  UPDATE TB_USER SET A = :a WHERE ID = :id;\n"
+        "    EXEC SQL DELETE FROM TB_LOG;\n"
+        "    EXEC SQL INSERT INTO TB_HIST (A) SELECT A FROM TB_USER;\n"
+        "}\n"
+    ),
+    # 공백/줄바꿈을 사이에 둔 연결 문자열, 이스케이프된 따옴표와 줄 이음
+    'string_chain': (
+        "void f() {\n"
+        '    strcpy(sql, "SELECT A "\n'
+        '                "  FROM TB_ORDER O "\n'
+        '                "  JOIN TB_ITEM I ON O.ID = I.ID");\n'
+        '    sprintf(sql, "UPDATE TB_ORDER SET NOTE = \\"x\\" WHERE ID = %d", id);\n'
+        '    strcpy(sql, "DELETE FROM TB_TEMP \\\n'
+        '  WHERE A = 1");\n'
+        '    strcpy(msg, "not sql at all");\n'
+        "}\n"
+    ),
+    # 키워드와 값이 줄바꿈으로 나뉜 설명 라인, 낮은 우선순위 패턴이 먼저 나오는 경우
+    # (세 줄 이상에 걸친 설명은 analyze_stream() 의 Note 대로 지원하지 않음)
+    'description': (
+        "/*\n"
+        " * Description : 영문 설명\n"
+        " * 프로그램 명 :\n   주문 일괄 처리\n"
+        " */\n"
+        "EXEC SQL SELECT A INTO :a FROM TB_CFG;\n"
+    ),
+    # 위의 경우가 한 파일에 섞인 경우
+    'mixed': (
+        "/* 프로그램명 : 정산 배치 */\n"
+        "EXEC SQL AT :db MERGE INTO TB_M T USING TB_S S ON (T.ID = S.ID)\n"
+        "  WHEN MATCHED THEN UPDATE SET T.A = S.A;\n"
+        'strcpy(sql, "SELECT * FROM TB_M "\n'
+        '            "WHERE A = 1");\n'
+        "EXEC SQL EXECUTE BEGIN UPDATE TB_A SET X = 1; END; END-EXEC;\n"
+        "EXEC SQL SELECT B INTO :b FROM TB_M;\n"
+    ),
+}
+
+
+def analyze_whole(src):
+    locations = {}
+    table_ops, source_desc = analyze_content(src, locations=locations)
+    return dict(table_ops), source_desc, locations
+
+
+def analyze_chunked(src, chunk_size):
+    locations = {}
+    table_ops, source_desc = analyze_stream(io.StringIO(src), chunk_size=chunk_size, locations=locations)
+    return dict(table_ops), source_desc, locations
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('name', sorted(SOURCES))
+def test_stream_matches_content(name, chunk_size):
+    src = SOURCES[name]
+    expected_ops, expected_desc, expected_locations = analyze_whole(src)
+    assert expected_ops  # 테스트 소스가 실제로 무언가를 찾는지 확인
+
+    table_ops, source_desc, locations = analyze_chunked(src, chunk_size)
+    assert table_ops == expected_ops
+    assert source_desc == expected_desc
+    # 청크마다 EXEC SQL 과 문자열 리터럴을 나눠 처리하므로 위치 목록의 순서만 다를 수 있음
+    assert {key: sorted(locs) for key, locs in locations.items()} == \
+        {key: sorted(locs) for key, locs in expected_locations.items()}
+
+
+def test_expected_results():
+    table_ops, source_desc, locations = analyze_whole(SOURCES['string_chain'])
+    assert set(table_ops) == {'TB_ORDER', 'TB_ITEM', 'TB_TEMP'}
+    assert locations[('TB_ITEM', 'SELECT')] == [(2, 17)]
+
+    _, source_desc, _ = analyze_whole(SOURCES['description'])
+    assert source_desc == "주문 일괄 처리"